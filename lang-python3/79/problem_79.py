@@ -1,9 +1,10 @@
+import heapq
+import os
 import time
 from abc import ABCMeta
-from queue import Queue
-from typing import Generator, Tuple, Dict, List
-
-from pydantic import BaseModel
+from array import array
+from collections import deque, Counter
+from typing import Generator, Tuple, Dict, List, Deque, Iterable, Sequence, Set, Callable
 
 
 # A common security method used for online banking is to ask the user for three random characters from a passcode.
@@ -13,6 +14,7 @@ from pydantic import BaseModel
 # Given that the three characters are always asked for in order, analyse the file so as to determine the shortest
 # possible secret passcode of unknown length.
 
+KEYLOG_FILE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "0079_keylog.txt")
 
 
 # for below "less than" and "greater than" refer to passcode position, not digit value
@@ -69,23 +71,386 @@ def solve_no_duplicates(attempt_generator: Generator[Tuple[int, int, int], None,
     root = find_root(adjacency_matrix)
 
     # Breadth-first-search for the shortest path that visits every node
-    queue: Queue[BFSVisit] = Queue()
-    queue.put(BFSVisit(node=root, path=[root]))
-    while not queue.empty():
-        visit = queue.get()
+    queue: Deque[BFSVisit] = deque()
+    queue.append(BFSVisit(root, None, 1 << root, 1))
+    while queue:
+        visit = queue.popleft()
         next_nodes = adjacency_matrix.get(visit.node, {})
         for next_node in next_nodes.keys():
-            if next_node in visit.path:
+            if visit.visited & (1 << next_node):
                 continue
-            next_path: List[int] = visit.path + [next_node]
-            if len(next_path) == len(adjacency_matrix):
-                return "".join(map(lambda val: str(val), next_path))
-            queue.put(BFSVisit(node=next_node, path=next_path))
+            next_visit = BFSVisit(next_node, visit, visit.visited | (1 << next_node), visit.length + 1)
+            if next_visit.length == len(adjacency_matrix):
+                return "".join(map(lambda val: str(val), next_visit.path()))
+            queue.append(next_visit)
 
     raise RuntimeError("Cannot determine a path that visits all nodes")
 
-def read_attempt_file() -> Generator[Tuple[int, int, int], None, None]:
-    with open("0079_keylog.txt", "r") as source_file:
+def get_successor_masks(adjacency_matrix: Dict[int, Dict[int, int]]) -> Dict[int, int]:
+    """
+    Convert the adjacency matrix into one successor bitmask per node, where bit n is set if node n must appear
+    later in the passcode.
+
+    :param adjacency_matrix:    The precedence graph from get_adjacency_matrix
+    :return:    The successor bitmask of every node
+    """
+    successor_masks: Dict[int, int] = {}
+    for source, target_dict in adjacency_matrix.items():
+        mask = 0
+        for target in target_dict.keys():
+            mask |= 1 << target
+        successor_masks[source] = mask
+    return successor_masks
+
+def topological_order(successor_masks: Dict[int, int]) -> Tuple[List[int], bool]:
+    """
+    Order the nodes with Kahn's algorithm so that every node precedes its successors.
+    The order is unique exactly when a single node is ready at every step.
+
+    :param successor_masks: The successor bitmask of every node
+    :return:    The nodes in order, and True if no other order is possible
+    """
+    in_degrees: Dict[int, int] = dict.fromkeys(successor_masks.keys(), 0)
+    for mask in successor_masks.values():
+        while mask:
+            lowest_bit = mask & -mask
+            in_degrees[lowest_bit.bit_length() - 1] += 1
+            mask ^= lowest_bit
+
+    ready: Deque[int] = deque(node for node, in_degree in in_degrees.items() if in_degree == 0)
+    order: List[int] = []
+    unique = True
+    while ready:
+        if len(ready) > 1:
+            unique = False
+        node = ready.popleft()
+        order.append(node)
+        mask = successor_masks[node]
+        while mask:
+            lowest_bit = mask & -mask
+            successor = lowest_bit.bit_length() - 1
+            in_degrees[successor] -= 1
+            if in_degrees[successor] == 0:
+                ready.append(successor)
+            mask ^= lowest_bit
+
+    if len(order) != len(successor_masks):
+        raise RuntimeError("Cannot order the graph, the attempts contain a cycle")
+    return order, unique
+
+def solve_topological(attempt_generator: Generator[Tuple[int, int, int], None, None]) -> str:
+    """
+    Without repeated digits the shortest passcode holds every digit once, so it is a topological order of the
+    precedence graph.  Any order is equally short when it is not unique.
+
+    :param attempt_generator:   The login attempts
+    :return:    The shortest passcode
+    """
+    order, _unique = topological_order(get_successor_masks(get_adjacency_matrix(attempt_generator)))
+    return "".join(map(lambda val: str(val), order))
+
+def remove_redundant_attempts(attempts: Iterable[str]) -> List[str]:
+    """
+    Drop empty and duplicate attempts, and any attempt that is a subsequence of another, since a passcode
+    containing the longer attempt already contains it.
+
+    :param attempts:    The login attempts
+    :return:    The attempts that constrain the passcode, longest first
+    """
+    kept: List[str] = []
+    for attempt in sorted(set(attempts), key=len, reverse=True):
+        if attempt and not any(is_subsequence(attempt, longer) for longer in kept):
+            kept.append(attempt)
+    return kept
+
+def is_subsequence(attempt: str, passcode: str) -> bool:
+    remaining = iter(passcode)
+    return all(character in remaining for character in attempt)
+
+def solve_shortest_supersequence(attempts: Iterable[str]) -> str:
+    """
+    Find the shortest passcode containing every attempt as a subsequence, allowing repeated characters.
+
+    This is an A* search over tuples holding how far each attempt has been matched.  Appending a character advances
+    every attempt that expects it next.  The lower bound is the sum, over all characters, of the most times any
+    attempt still needs that character; each step lowers it by at most one, so the first complete state reached is
+    optimal.
+
+    :param attempts:    The login attempts, of any length
+    :return:    A shortest passcode
+    """
+    attempts = remove_redundant_attempts(attempts)
+    if not attempts:
+        return ""
+
+    # remaining_counts[i][p]: the character counts of attempts[i][p:]
+    remaining_counts: List[List[Counter]] = []
+    for attempt in attempts:
+        counts: List[Counter] = [Counter()]
+        for character in reversed(attempt):
+            counts.append(counts[-1] + Counter(character))
+        remaining_counts.append(counts[::-1])
+
+    def lower_bound(positions: Tuple[int, ...]) -> int:
+        needed: Dict[str, int] = {}
+        for attempt_index, position in enumerate(positions):
+            for character, count in remaining_counts[attempt_index][position].items():
+                if count > needed.get(character, 0):
+                    needed[character] = count
+        return sum(needed.values())
+
+    start: Tuple[int, ...] = (0,) * len(attempts)
+    goal: Tuple[int, ...] = tuple(len(attempt) for attempt in attempts)
+    parents: Dict[Tuple[int, ...], Tuple[Tuple[int, ...], str] | None] = {start: None}
+    lengths: Dict[Tuple[int, ...], int] = {start: 0}
+    frontier: List[Tuple[int, int, int, Tuple[int, ...]]] = [(lower_bound(start), 0, 0, start)]
+    push_count = 0
+    while frontier:
+        _estimate, negative_length, _order, positions = heapq.heappop(frontier)
+        length = -negative_length
+        if length > lengths[positions]:
+            continue
+        if positions == goal:
+            passcode: List[str] = []
+            parent = parents[positions]
+            while parent is not None:
+                passcode.append(parent[1])
+                parent = parents[parent[0]]
+            return "".join(reversed(passcode))
+
+        next_characters = {attempt[position] for attempt, position in zip(attempts, positions)
+                           if position < len(attempt)}
+        for character in next_characters:
+            next_positions = tuple(position + 1 if position < len(attempt) and attempt[position] == character
+                                   else position for attempt, position in zip(attempts, positions))
+            if next_positions in lengths and lengths[next_positions] <= length + 1:
+                continue
+            lengths[next_positions] = length + 1
+            parents[next_positions] = (positions, character)
+            push_count += 1
+            # Prefer deeper states among equal estimates to reach the goal sooner
+            heapq.heappush(frontier, (length + 1 + lower_bound(next_positions), -(length + 1), push_count,
+                                      next_positions))
+
+    raise RuntimeError("Cannot find a passcode containing every attempt")
+
+class PrecedenceCycleError(RuntimeError):
+
+    def __init__(self, message: str):
+        super().__init__(message)
+
+class PasscodeInferer(metaclass=ABCMeta):
+    """
+    Infers the passcode from a stream of attempts, keeping the precedence graph and a topological order of its nodes
+    up to date as each attempt arrives.
+
+    New edges are ordered with the Pearce-Kelly algorithm: an edge that already agrees with the current order costs
+    nothing, and otherwise only the nodes positioned between the edge's endpoints and reachable from them are
+    searched and reordered.  An attempt that would create a cycle raises PrecedenceCycleError immediately and leaves
+    the graph's nodes and edges as they were before the attempt; the order may differ but remains topological.
+    """
+    successors: Dict[int, Set[int]]
+    predecessors: Dict[int, Set[int]]
+    order: List[int]  # the nodes in topological order
+    positions: Dict[int, int]  # the index of each node within order
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.successors = {}
+        self.predecessors = {}
+        self.order = []
+        self.positions = {}
+
+    def add_attempts(self, attempts: Iterable[Sequence[int]]) -> None:
+        for attempt in attempts:
+            self.add_attempt(attempt)
+
+    def add_attempt(self, attempt: Sequence[int]) -> None:
+        """
+        Record that the attempt's digits appear in the passcode in the given order.
+
+        :param attempt: The digits of a login attempt
+        :raises PrecedenceCycleError: if the attempt contradicts the attempts seen so far
+        """
+        added_nodes: List[int] = []
+        for node in attempt:
+            if self.add_node(node):
+                added_nodes.append(node)
+        added_edges: List[Tuple[int, int]] = []
+        try:
+            for source, target in zip(attempt, attempt[1:]):
+                if self.add_edge(source, target):
+                    added_edges.append((source, target))
+        except PrecedenceCycleError:
+            for source, target in added_edges:
+                self.remove_edge(source, target)
+            self.remove_nodes(added_nodes)
+            raise
+
+    def add_node(self, node: int) -> bool:
+        """
+        :return:    True if the node is new
+        """
+        if node in self.positions:
+            return False
+        self.successors[node] = set()
+        self.predecessors[node] = set()
+        self.positions[node] = len(self.order)
+        self.order.append(node)
+        return True
+
+    def remove_nodes(self, nodes: Iterable[int]) -> None:
+        """
+        Remove nodes that no longer have any edges, closing the gaps they leave in the order.
+        """
+        removed = set(nodes)
+        if not removed:
+            return
+        for node in removed:
+            del self.successors[node]
+            del self.predecessors[node]
+            del self.positions[node]
+        self.order = [node for node in self.order if node not in removed]
+        for position, node in enumerate(self.order):
+            self.positions[node] = position
+
+    def add_edge(self, source: int, target: int) -> bool:
+        """
+        Add the precedence source -> target, reordering the affected nodes if the current order disagrees with it.
+
+        :param source:  The digit that appears first
+        :param target:  The digit that appears later
+        :return:    True if the edge is new
+        :raises PrecedenceCycleError: if target already precedes source
+        """
+        if target in self.successors[source]:
+            return False
+
+        lower_bound = self.positions[target]
+        upper_bound = self.positions[source]
+        if lower_bound <= upper_bound:
+            forward = self._search(target, self.successors, lambda node: self.positions[node] <= upper_bound, source)
+            backward = self._search(source, self.predecessors, lambda node: self.positions[node] >= lower_bound)
+            self._reorder(backward, forward)
+
+        self.successors[source].add(target)
+        self.predecessors[target].add(source)
+        return True
+
+    def remove_edge(self, source: int, target: int) -> None:
+        # Removing an edge never invalidates the order
+        self.successors[source].discard(target)
+        self.predecessors[target].discard(source)
+
+    def _search(self, start: int, edges: Dict[int, Set[int]], in_range: Callable[[int], bool],
+                forbidden: int | None = None) -> List[int]:
+        """
+        :return: The nodes reachable from start through the given edges without leaving the affected range
+        :raises PrecedenceCycleError: if the forbidden node is reached
+        """
+        visited: Set[int] = {start}
+        stack: List[int] = [start]
+        while stack:
+            node = stack.pop()
+            if node == forbidden:
+                raise PrecedenceCycleError(f"Attempt contradicts earlier attempts: {start} must precede {forbidden}")
+            for neighbour in edges[node]:
+                if neighbour not in visited and in_range(neighbour):
+                    visited.add(neighbour)
+                    stack.append(neighbour)
+        return list(visited)
+
+    def _reorder(self, backward: List[int], forward: List[int]) -> None:
+        """
+        Move the nodes that must precede the new edge ahead of the nodes that must follow it, reusing the positions
+        the two sets already occupy.
+        """
+        backward.sort(key=lambda node: self.positions[node])
+        forward.sort(key=lambda node: self.positions[node])
+        nodes = backward + forward
+        for position, node in zip(sorted(self.positions[node] for node in nodes), nodes):
+            self.positions[node] = position
+            self.order[position] = node
+
+    def is_unique(self) -> bool:
+        """
+        :return: True if the attempts so far allow only one order, meaning each node has an edge to the next one
+        """
+        return all(target in self.successors[source] for source, target in zip(self.order, self.order[1:]))
+
+    def passcode(self) -> str:
+        return "".join(map(lambda val: str(val), self.order))
+
+# Byte lookup table mapping the digit characters to the values 0-9
+_DIGIT_VALUES: bytes = bytes.maketrans(b"0123456789", bytes(range(0, 10)))
+_WHITESPACE: bytes = b" \t\r\n"
+_DIGITS: bytes = bytes(range(0, 10))
+
+def read_attempt_digits(path: str = KEYLOG_FILE, attempt_length: int = 3,
+                        block_size: int = 1 << 22) -> array:
+    """
+    Bulk load a keylog file, reading it in large blocks and converting every digit through a byte lookup table
+    rather than building a list per line.
+
+    :param path:            The keylog file, one attempt per line
+    :param attempt_length:  The number of digits in each attempt
+    :param block_size:      The number of bytes to read at a time
+    :return:    The digit values of every attempt, attempt_length entries per attempt
+    """
+    digits = array("B")
+    with open(path, "rb") as source_file:
+        while block := source_file.read(block_size):
+            values = block.translate(_DIGIT_VALUES, _WHITESPACE)
+            if values.translate(None, _DIGITS):
+                raise ValueError(f"Keylog contains non-digit characters: {path}")
+            digits.frombytes(values)
+    if len(digits) % attempt_length != 0:
+        raise ValueError(f"Keylog does not contain whole {attempt_length} digit attempts: {path}")
+    return digits
+
+def get_bulk_successor_masks(digits: array, attempt_length: int = 3, alphabet_size: int = 10) -> Dict[int, int]:
+    """
+    Build the successor bitmasks from bulk-loaded attempts.  Each precedence pair is encoded as source * alphabet_size
+    + target and marked in a bytearray of alphabet_size² cells, from which the masks are built.  While the codes fit in
+    a byte, a whole column of codes is computed at once: read as big-endian integers, sources * alphabet_size +
+    targets has every pair's code in its own byte with no carries, and each possible code is then found with a byte
+    search rather than a per-pair loop.
+
+    :param digits:          The digit values from read_attempt_digits
+    :param attempt_length:  The number of digits in each attempt
+    :param alphabet_size:   The number of distinct digit values
+    :return:    The successor bitmask of every digit that appears in an attempt
+    """
+    cell_count = alphabet_size * alphabet_size
+    marked = bytearray(cell_count)
+    for offset in range(0, attempt_length - 1):
+        sources = digits[offset::attempt_length]
+        targets = digits[offset + 1::attempt_length]
+        if cell_count <= 256:
+            codes = (int.from_bytes(sources.tobytes()) * alphabet_size + int.from_bytes(targets.tobytes())).to_bytes(
+                len(sources))
+            for code in range(0, cell_count):
+                if not marked[code] and bytes((code,)) in codes:
+                    marked[code] = 1
+        else:
+            for source, target in zip(sources, targets):
+                marked[source * alphabet_size + target] = 1
+
+    successor_matrix: List[int] = [0] * alphabet_size
+    code = marked.find(1)
+    while code != -1:
+        source, target = divmod(code, alphabet_size)
+        successor_matrix[source] |= 1 << target
+        code = marked.find(1, code + 1)
+    present = digits.tobytes()
+    return {node: successor_matrix[node] for node in range(0, alphabet_size) if bytes((node,)) in present}
+
+def solve_bulk(path: str = KEYLOG_FILE) -> str:
+    order, _unique = topological_order(get_bulk_successor_masks(read_attempt_digits(path)))
+    return "".join(map(lambda val: str(val), order))
+
+def read_attempt_file(path: str = KEYLOG_FILE) -> Generator[Tuple[int, int, int], None, None]:
+    with open(path, "r") as source_file:
         for line in source_file:
             yield [int(line[0]), int(line[1]), int(line[2])]
 
@@ -93,16 +458,46 @@ def generate_attempts(attempts: List[str]) -> Generator[Tuple[int, int, int], No
     for attempt in attempts:
         yield [int(attempt[0]), int(attempt[1]), int(attempt[2])]
 
-class BFSVisit(BaseModel):
+class BFSVisit(metaclass=ABCMeta):
+    """
+    A node reached by the breadth-first search.  The path is kept as a pointer to the previous visit rather than a
+    copied list, and the nodes on it as a bitmask so that membership checks are a single AND.
+    """
+    __slots__ = ("node", "parent", "visited", "length")
+
     node: int
-    path: List[int]
+    parent: "BFSVisit | None"
+    visited: int
+    length: int
+
+    def __init__(self, node: int, parent: "BFSVisit | None", visited: int, length: int):
+        self.node = node
+        self.parent = parent
+        self.visited = visited
+        self.length = length
+
+    def path(self) -> List[int]:
+        """
+        :return: The nodes from the root to this visit
+        """
+        path: List[int] = []
+        visit: BFSVisit | None = self
+        while visit is not None:
+            path.append(visit.node)
+            visit = visit.parent
+        path.reverse()
+        return path
 
 if __name__ == "__main__":
 
     player_1_victories = 0
     start_time = time.time()
 
-    result = solve_no_duplicates(read_attempt_file())
+    # result = solve_no_duplicates(read_attempt_file())
+    # inferer = PasscodeInferer()
+    # inferer.add_attempts(read_attempt_file())
+    # result = inferer.passcode()
+    result = solve_topological(read_attempt_file())
     end_time = time.time()
 
     print(f"Result: {result}\nTime: {end_time - start_time}")
@@ -1,7 +1,15 @@
+import argparse
+import asyncio
 import copy
+import json
+import os
+import sys
+import threading
 import time
 from abc import ABCMeta
-from typing import Generator, List, Set, Iterable, Dict, FrozenSet
+from collections import deque
+from contextlib import nullcontext
+from typing import Generator, List, Set, Iterable, Dict, FrozenSet, Deque, Tuple, Any
 
 
 # Su Doku (Japanese meaning number place) is the name given to a popular puzzle concept. Its origin is unclear, but
@@ -21,80 +29,104 @@ from typing import Generator, List, Set, Iterable, Dict, FrozenSet
 # By solving all fifty puzzles find the sum of the 3-digit numbers found in the top left corner of each solution grid;
 # for example, 483 is the 3-digit number found in the top left corner of the solution grid above.
 
+GRID_FILE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "p096_sudoku.txt")
+
 
 class NoOptionsError(RuntimeError):
 
     def __init__(self, message: str):
         super().__init__(message)
 
-class CellIndex(metaclass=ABCMeta):
-    col: int
-    row: int
 
-    def __init__(self, col: int, row: int):
-        self.col = col
-        self.row = row
+class SolveInterruptedError(RuntimeError):
+    """
+    Raised inside a budgeted search when its budget runs out or it is cancelled.
+    """
+    reason: str  # "cancelled", "node_budget", or "deadline"
+
+    def __init__(self, reason: str):
+        super().__init__(f"Search interrupted: {reason}")
+        self.reason = reason
+
+
+# Cells are numbered 0-80 in row-major order (cell = 9 * row + col), and every table below is indexed by those ids so
+# that the propagation code only ever performs integer indexing.
+all_cells: Tuple[int, ...] = tuple(range(0, 81))
+cell_cols: Tuple[int, ...] = tuple(cell % 9 for cell in all_cells)
+cell_rows: Tuple[int, ...] = tuple(cell // 9 for cell in all_cells)
+_block_segments: Tuple[int, ...] = (0, 0, 0, 1, 1, 1, 2, 2, 2)
+cell_blocks: Tuple[int, ...] = tuple(3 * _block_segments[cell_cols[cell]] + _block_segments[cell_rows[cell]]
+                                     for cell in all_cells)
+
+columns: Tuple[Tuple[int, ...], ...] = tuple(tuple(9 * row + col for row in range(0, 9)) for col in range(0, 9))
+rows: Tuple[Tuple[int, ...], ...] = tuple(tuple(9 * row + col for col in range(0, 9)) for row in range(0, 9))
+blocks: Tuple[Tuple[int, ...], ...] = tuple(tuple(cell for cell in all_cells if cell_blocks[cell] == block)
+                                            for block in range(0, 9))
+
+# Scope indices: 0-8 are the columns, 9-17 the rows, and 18-26 the blocks
+ROW_SCOPE_OFFSET: int = 9
+BLOCK_SCOPE_OFFSET: int = 18
+scopes: Tuple[Tuple[int, ...], ...] = columns + rows + blocks
+cell_scopes: Tuple[Tuple[int, int, int], ...] = tuple(
+    (cell_cols[cell], ROW_SCOPE_OFFSET + cell_rows[cell], BLOCK_SCOPE_OFFSET + cell_blocks[cell])
+    for cell in all_cells)
 
-    def __str__(self):
-        return f"[{self.col}, {self.row}]"
+# The 20 cells sharing a column, row, or block with each cell
+peers: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(sorted(set(columns[cell_cols[cell]] + rows[cell_rows[cell]] + blocks[cell_blocks[cell]]) - {cell}))
+    for cell in all_cells)
 
-    def __eq__(self, other):
-        if not isinstance(other, CellIndex):
-            return False
-        return self.col == other.col and self.row == other.row
+# block_minus_line[line scope][block]: the members of the block outside a row or column (pointing eliminations)
+block_minus_line: Tuple[Tuple[Tuple[int, ...], ...], ...] = tuple(
+    tuple(tuple(cell for cell in blocks[block] if cell not in scopes[line]) for block in range(0, 9))
+    for line in range(0, BLOCK_SCOPE_OFFSET))
+# line_minus_block[block][line scope]: the members of a row or column outside the block (claiming eliminations)
+line_minus_block: Tuple[Tuple[Tuple[int, ...], ...], ...] = tuple(
+    tuple(tuple(cell for cell in scopes[line] if cell not in blocks[block]) for line in range(0, BLOCK_SCOPE_OFFSET))
+    for block in range(0, 9))
 
-    def __hash__(self):
-        return hash((self.col, self.row))
 
+def cell_index(col: int, row: int) -> int:
+    return 9 * row + col
 
-columns: List[List[CellIndex]] = []
-rows: List[List[CellIndex]] = []
-blocks: List[List[CellIndex]] = []
-all_cells: List[CellIndex] = []
-for i in range(0, 9):
-    columns.append([])
-    rows.append([])
-    for j in range(0, 9):
-        columns[i].append(CellIndex(i, j))
-        rows[i].append(CellIndex(j, i))
-        all_cells.append(CellIndex(i, j))
 
-for col_range in [range(0, 3), range(3, 6), range(6, 9)]:
-    for row_range in [range(0, 3), range(3, 6), range(6, 9)]:
-        block_range: List[CellIndex] = []
-        for col_index in col_range:
-            for row_index in row_range:
-                block_range.append(CellIndex(col_index, row_index))
-        blocks.append(block_range)
+def describe_cell(cell: int) -> str:
+    return f"[{cell_cols[cell]}, {cell_rows[cell]}]"
 
 
 class Grid(metaclass=ABCMeta):
     """
     This class represents a Sudoku puzzle with selected values and tracked options for unknown values.
-    """
-    values: List[List[int]]  # x, y | col, row
-    options: List[List[List[int]]]
 
-    def __init__(self) -> None:
+    Every change to a cell's options queues the cell's scopes (column, row, and block) for re-processing, so that
+    propagation only revisits the parts of the grid that have actually changed.
+    """
+    name: str
+    values: List[int]  # indexed by cell id
+    options: List[List[int]]
+    pending_cells: Deque[int]
+    pending_scopes: Deque[int]
+    queued_scopes: List[bool]
+    eliminated_count: int  # running total of options removed, used by SolveStats
+
+    def __init__(self, name: str = "") -> None:
         super().__init__()
-        self.values = []
-        self.options = []
-        for col in range(0, 9):
-            self.values.append([])
-            self.options.append([])
-            for _row in range(0, 9):
-                self.values[col].append(0)
-                self.options[col].append(list(range(1, 10)))
+        self.name = name
+        self.values = [0] * len(all_cells)
+        self.options = [list(range(1, 10)) for _cell in all_cells]
+        self.pending_cells = deque()
+        self.pending_scopes = deque()
+        self.queued_scopes = [False] * len(scopes)
+        self.eliminated_count = 0
 
     def is_solved(self) -> bool:
         """
         :return: True if this sudoku grid is fully solved
         """
-        for row in self.values:
-            for value in row:
-                if value == 0:
-                    return False
-        return True
+        return 0 not in self.values
+
+    def value_at(self, col: int, row: int) -> int:
+        return self.values[cell_index(col, row)]
 
     def set_value_at(self, col: int, row: int, value: int) -> None:
         """
@@ -107,131 +139,429 @@ class Grid(metaclass=ABCMeta):
         """
         if col < 0 or col > 8 or row < 0 or row > 8:
             raise RuntimeError(f"Cannot set out of range value {col}:{row}")
-        self.values[col][row] = value
+        self.set_cell_value(cell_index(col, row), value)
+
+    def set_cell_value(self, cell: int, value: int) -> None:
+        """
+        Set the given cell to the given value, removing the value from the options of the cell's peers.
+
+        :param cell:    The id of the cell to set
+        :param value:   The value of the cell
+        """
         if value == 0:
+            self.values[cell] = value
             return
+        if value not in self.options[cell]:
+            raise NoOptionsError(f"Value {value} is not an option for cell: {describe_cell(cell)}")
+        self.values[cell] = value
 
         # Clear options
-        self.options[col][row] = []
+        self.options[cell] = []
+        self.queue_scopes(cell)
 
         # Remove value from block, column, and row options
-        self.remove_options([value], blocks[get_block_index(col, row)])
-        self.remove_options([value], columns[col])
-        self.remove_options([value], rows[row])
+        self.remove_options([value], peers[cell])
+
+    def set_options_at(self, cell: int, options: List[int]) -> None:
+        """
+        Replace the options of the given cell, queueing its scopes for re-processing.
+
+        :param cell:    The id of the cell
+        :param options: The new value options of the cell
+        """
+        self.eliminated_count += len(self.options[cell]) - len(options)
+        self.options[cell] = options
+        self.queue_scopes(cell)
+        if len(options) == 1:
+            self.pending_cells.append(cell)
 
-    def remove_options(self, options: List[int], cells: Iterable[CellIndex]) -> bool:
+    def remove_options(self, options: List[int], cells: Iterable[int]) -> bool:
         """
         Remove the given options from the given cells.
+        Cells whose options change have their scopes queued, and cells left with a single option are queued to be set.
 
         :param options: The value options to remove
-        :param cells:   The cells
-        :return:
+        :param cells:   The cell ids
+        :return:    True if any option was removed
         """
         removed_count: int = 0
         for cell in cells:
+            cell_options = self.options[cell]
+            cell_removed_count = 0
             for option in options:
                 try:
-                    self.options[cell.col][cell.row].remove(option)
-                    if len(self.options[cell.col][cell.row]) == 0:
-                        raise NoOptionsError(f"Removed last option for cell: {CellIndex(cell.col, cell.row)}")
-                    removed_count += 1
+                    cell_options.remove(option)
+                    if len(cell_options) == 0:
+                        raise NoOptionsError(f"Removed last option for cell: {describe_cell(cell)}")
+                    cell_removed_count += 1
                 except ValueError:
                     pass
+            if cell_removed_count > 0:
+                removed_count += cell_removed_count
+                self.eliminated_count += cell_removed_count
+                self.queue_scopes(cell)
+                if len(cell_options) == 1:
+                    self.pending_cells.append(cell)
         return removed_count > 0
 
+    def queue_scopes(self, cell: int) -> None:
+        """
+        Queue the column, row, and block containing the given cell for re-processing, unless already queued.
+
+        :param cell: The id of the changed cell
+        """
+        queued_scopes = self.queued_scopes
+        for scope_index in cell_scopes[cell]:
+            if not queued_scopes[scope_index]:
+                queued_scopes[scope_index] = True
+                self.pending_scopes.append(scope_index)
+
     def __str__(self) -> str:
         str_value = ""
-        for row in range(0, 9):
-            for col in range(0, 9):
-                str_value += f"{self.values[col][row]} "
+        for row in rows:
+            for cell in row:
+                str_value += f"{self.values[cell]} "
             str_value += "\n"
         return str_value
 
 
-def solve(grid: Grid) -> None:
-    updated: bool = True
+class SolveStats(metaclass=ABCMeta):
+    """
+    Optional instrumentation for solve(): the options eliminated by each technique, the shape of the guess-and-check
+    search tree, and the time spent in each phase.  Solving without a SolveStats skips all of the bookkeeping.
+    """
+    TECHNIQUES: Tuple[str, ...] = ("naked_single", "hidden_single", "naked_tuple", "hidden_tuple", "pointing",
+                                   "claiming")
+
+    puzzle: str
+    eliminations: Dict[str, int]
+    guesses: int
+    backtracks: int
+    max_depth: int
+    phase_times: Dict[str, float]
+
+    def __init__(self, puzzle: str = "") -> None:
+        super().__init__()
+        self.puzzle = puzzle
+        self.eliminations = dict.fromkeys(self.TECHNIQUES, 0)
+        self.guesses = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.phase_times = {"propagation": 0.0, "guessing": 0.0, "total": 0.0}
+
+    def record_eliminations(self, technique: str, count: int) -> None:
+        self.eliminations[technique] += count
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        self.phase_times[phase] += seconds
+
+    def to_record(self) -> Dict[str, Any]:
+        return {
+            "puzzle": self.puzzle,
+            "eliminations": self.eliminations,
+            "guesses": self.guesses,
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "phase_times": self.phase_times,
+        }
+
+    def to_json(self) -> str:
+        """
+        :return: This record serialized as a single JSON line
+        """
+        return json.dumps(self.to_record())
+
+
+class SolveBudget(metaclass=ABCMeta):
+    """
+    Limits on one guess-and-check search: a wall-clock timeout, a number of search nodes, and a cancellation flag that
+    another thread may set.  They are checked once per node, where a counter increment and a clock read are small
+    next to the grid copy each node already makes, and the timeout runs from start().
+
+    start() keeps the cancellation flag, so a cancel() that lands before the search begins still stops it.  A cancelled
+    budget stops every later search too until reset() is called.
+    """
+    timeout: float | None
+    max_nodes: int | None
+    nodes: int
+    deadline: float | None  # time.perf_counter() value, set by start()
+    cancelled: threading.Event
+
+    def __init__(self, timeout: float | None = None, max_nodes: int | None = None) -> None:
+        """
+        :param timeout:     [optional] The seconds the search may run for
+        :param max_nodes:   [optional] The number of grids the search may propagate, the original puzzle included
+        """
+        super().__init__()
+        self.timeout = timeout
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.deadline = None
+        self.cancelled = threading.Event()
+
+    def start(self) -> None:
+        """
+        Reset the node count and start the timeout.  The cancellation flag is left as it is.
+        """
+        self.nodes = 0
+        self.deadline = time.perf_counter() + self.timeout if self.timeout is not None else None
+
+    def reset(self) -> None:
+        """
+        Clear the cancellation flag so the budget can limit another search.
+        """
+        self.cancelled.clear()
+
+    def cancel(self) -> None:
+        """
+        Stop the search at its next node.  Safe to call from any thread.
+        """
+        self.cancelled.set()
+
+    def charge(self) -> None:
+        """
+        Count one search node.
+
+        :raises SolveInterruptedError: if the search is cancelled or out of budget
+        """
+        if self.cancelled.is_set():
+            raise SolveInterruptedError("cancelled")
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise SolveInterruptedError("node_budget")
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SolveInterruptedError("deadline")
+
+
+class BudgetedSolve(metaclass=ABCMeta):
+    """
+    The outcome of solve_with_budget().  Unless solved, the grid holds only what propagation deduced from the clues,
+    and never the values of an abandoned guess, so every value set in it is part of any solution.
+    """
+    status: str  # "solved", "unsolvable", or the SolveInterruptedError reason
+    grid: Grid
+    stats: SolveStats
+    nodes: int
+    elapsed: float
+
+    def __init__(self, status: str, grid: Grid, stats: SolveStats, nodes: int, elapsed: float) -> None:
+        super().__init__()
+        self.status = status
+        self.grid = grid
+        self.stats = stats
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    @property
+    def solved(self) -> bool:
+        return self.status == "solved"
+
+    def filled_cells(self) -> int:
+        return sum(1 for value in self.grid.values if value)
+
+    def to_record(self) -> Dict[str, Any]:
+        return {"status": self.status, "nodes": self.nodes, "elapsed": self.elapsed,
+                "filled_cells": self.filled_cells(), **self.stats.to_record()}
 
-    while updated:
-        updated = False
-        scope_processing_updates = True
-        while scope_processing_updates:
-            scope_processing_updates = process_scopes(grid)
-            updated = updated or scope_processing_updates
+
+def solve(grid: Grid, stats: SolveStats | None = None, depth: int = 0) -> None:
+    """
+    Solve the grid in place, propagating constraints and falling back to guess-and-check.
+
+    :param grid:    The grid to solve
+    :param stats:   Optional statistics to collect while solving
+    :param depth:   The guess-and-check depth of this grid, 0 for the original puzzle
+    :raises NoOptionsError: if the grid has no solution
+    """
+    if stats is None:
+        _solve(grid, None, depth)
+        return
+
+    start_time = time.perf_counter()
+    try:
+        _solve(grid, stats, depth)
+    finally:
+        if depth == 0:
+            stats.add_time("total", time.perf_counter() - start_time)
+
+def solve_with_budget(grid: Grid, budget: SolveBudget, stats: SolveStats | None = None) -> BudgetedSolve:
+    """
+    Solve the grid in place like solve(), but give up once the budget runs out or is cancelled.
+
+    :param grid:    The grid to solve
+    :param budget:  The limits of the search, started by this call
+    :param stats:   Statistics to collect while solving, created if not given
+    :return: The status of the search, the grid, and the search statistics
+    """
+    stats = stats if stats is not None else SolveStats(grid.name)
+    budget.start()
+    start_time = time.perf_counter()
+    try:
+        _solve(grid, stats, 0, budget)
+        status = "solved"
+    except NoOptionsError:
+        status = "unsolvable"
+    except SolveInterruptedError as error:
+        status = error.reason
+    elapsed = time.perf_counter() - start_time
+    stats.add_time("total", elapsed)
+    return BudgetedSolve(status, grid, stats, budget.nodes, elapsed)
+
+async def solve_async(grid: Grid, budget: SolveBudget, stats: SolveStats | None = None) -> BudgetedSolve:
+    """
+    Run solve_with_budget() on the event loop's default executor.  Cancelling the awaiting task cancels the budget and
+    waits for the search to stop, so the grid is not modified after the cancellation is delivered.
+    """
+    search = asyncio.get_running_loop().run_in_executor(None, solve_with_budget, grid, budget, stats)
+    try:
+        return await asyncio.shield(search)
+    except asyncio.CancelledError:
+        budget.cancel()
+        await search
+        raise
+
+def _solve(grid: Grid, stats: SolveStats | None, depth: int, budget: SolveBudget | None = None) -> None:
+    if budget is not None:
+        budget.charge()
+    if stats is None:
+        propagate(grid)
+    else:
+        stats.max_depth = max(stats.max_depth, depth)
+        phase_start = time.perf_counter()
+        try:
+            propagate(grid, stats)
+        finally:
+            stats.add_time("propagation", time.perf_counter() - phase_start)
 
     if not grid.is_solved():
         # Fall back to relying on guess-and-check
-        guesses = find_guesses(grid)
+        if stats is None:
+            guesses = find_guesses(grid)
+        else:
+            phase_start = time.perf_counter()
+            try:
+                guesses = find_guesses(grid)
+            finally:
+                stats.add_time("guessing", time.perf_counter() - phase_start)
+
         for guess in guesses:
             try:
-                solve(guess)
+                if stats is not None:
+                    stats.guesses += 1
+                _solve(guess, stats, depth + 1, budget)
                 grid.values = guess.values
                 grid.options = guess.options
                 return
             except NoOptionsError:
                 # Guess resulted in an unsolvable grid, try the next one
+                if stats is not None:
+                    stats.backtracks += 1
                 continue
 
         raise NoOptionsError("Cannot solve grid, no single options left for any cell")
 
+def count_solutions(grid: Grid, limit: int = 2) -> int:
+    """
+    Count the solutions of a grid without modifying it, stopping once the limit is reached.
+    A well-formed puzzle has exactly one solution, so the default limit is enough to check uniqueness.
+
+    :param grid:    The grid to check
+    :param limit:   The number of solutions after which to stop searching
+    :return:    The number of solutions found, at most the limit
+    """
+    return _count_solutions(copy.deepcopy(grid), limit)
+
+def _count_solutions(grid: Grid, limit: int) -> int:
+    try:
+        propagate(grid)
+        if grid.is_solved():
+            return 1
+        guesses = find_guesses(grid)
+    except NoOptionsError:
+        return 0
+
+    count = 0
+    for guess in guesses:
+        count += _count_solutions(guess, limit - count)
+        if count >= limit:
+            break
+    return count
+
 def find_guesses(grid: Grid) -> List[Grid]:
     guesses: List[Grid]
     for cell in all_cells:
         guesses = []
-        cell_options = grid.options[cell.col][cell.row]
+        cell_options = grid.options[cell]
         if len(cell_options) == 0:
             continue
         try:
             for option in cell_options:
                 guess = copy.deepcopy(grid)
-                guess.set_value_at(cell.col, cell.row, option)
+                guess.set_cell_value(cell, option)
                 guesses.append(guess)
             return guesses
         except NoOptionsError:
             pass
     raise NoOptionsError("All options failed?!")
 
-def process_scopes(grid: Grid) -> bool:
-    updated: bool = False
+def propagate(grid: Grid, stats: SolveStats | None = None) -> None:
+    """
+    Drain the grid's work queues until no further deductions can be made.
+    Cells left with a single option are set first, then each queued scope is re-processed.  Any change made while
+    processing queues further work, so the effort is proportional to the changes rather than to the grid size.
 
-    # Look for any cells that only have a single option
-    for cell_index in all_cells:
-        options = grid.options[cell_index.col][cell_index.row]
-        if len(options) == 1:
-            grid.set_value_at(cell_index.col, cell_index.row, options[0])
-            updated = True
+    :param grid:    The grid to propagate
+    :param stats:   Optional statistics to record eliminations in
+    """
+    while grid.pending_cells or grid.pending_scopes:
+        if grid.pending_cells:
+            cell = grid.pending_cells.popleft()
+            options = grid.options[cell]
+            if grid.values[cell] == 0 and len(options) == 1:
+                eliminated_count = grid.eliminated_count
+                grid.set_cell_value(cell, options[0])
+                if stats is not None:
+                    stats.record_eliminations("naked_single", grid.eliminated_count - eliminated_count)
+            continue
 
-    # Look for any cells that is the only option for a value within a scope
-    for column_siblings in columns:
-        updated = set_only_options(grid, column_siblings)
-        updated = reduce_block_options(grid, column_siblings) or updated
-    for row_siblings in rows:
-        updated = set_only_options(grid, row_siblings) or updated
-        updated = reduce_block_options(grid, row_siblings) or updated
-    for block_siblings in blocks:
-        updated = set_only_options(grid, block_siblings) or updated
-        updated = reduce_row_and_column_options(grid, block_siblings) or updated
+        scope_index = grid.pending_scopes.popleft()
+        grid.queued_scopes[scope_index] = False
+        process_scope(grid, scope_index, stats)
 
-    return updated
+def process_scope(grid: Grid, scope_index: int, stats: SolveStats | None = None) -> bool:
+    """
+    Look for any cells that are the only option for a value within the scope, and for any values that the scope
+    restricts to a single intersecting row, column, or block.
+
+    :param grid:        The grid to process
+    :param scope_index: The index of the column, row, or block within scopes
+    :param stats:       Optional statistics to record eliminations in
+    :returns:           True if the grid was modified
+    """
+    updated = set_only_options(grid, scopes[scope_index], stats)
+    if scope_index < BLOCK_SCOPE_OFFSET:
+        return reduce_block_options(grid, scope_index, stats) or updated
+    return reduce_row_and_column_options(grid, scope_index - BLOCK_SCOPE_OFFSET, stats) or updated
 
 
-def set_only_options(grid: Grid, siblings: List[CellIndex]) -> bool:
+def set_only_options(grid: Grid, siblings: Tuple[int, ...], stats: SolveStats | None = None) -> bool:
     """
     Process a sibling scope (row, column, or block) looking for:
     1. any value that only has a single cell as an option
     2. any limiting set of cells that bound options (Example: two cells that are the only options for two values)
 
     :param grid:        The grid to process
-    :param siblings:    The cells that make up the scope
+    :param siblings:    The cell ids that make up the scope
+    :param stats:       Optional statistics to record eliminations in
     :returns:           True if the grid was modified
     """
     updated = False
     # Record limited sets of cells that contain the same cardinality of options.
-    tuples: Dict[FrozenSet[int], Set[CellIndex]]
-    potential_cells_by_value: Dict[int, Set[CellIndex]] = dict(map(lambda x: (x, set()), range(1,10)))
-    cells_by_options: Dict[FrozenSet[int], Set[CellIndex]] = {}
+    potential_cells_by_value: Dict[int, Set[int]] = dict(map(lambda x: (x, set()), range(1,10)))
+    cells_by_options: Dict[FrozenSet[int], Set[int]] = {}
 
     for sibling_cell in siblings:
-        sibling_options = frozenset(grid.options[sibling_cell.col][sibling_cell.row])
+        sibling_options = frozenset(grid.options[sibling_cell])
 
         if sibling_options not in cells_by_options:
             cells_by_options[sibling_options] = set()
@@ -241,91 +571,122 @@ def set_only_options(grid: Grid, siblings: List[CellIndex]) -> bool:
             potential_cells_by_value[sibling_option].add(sibling_cell)
 
     # Set single-option values
+    eliminated_count = grid.eliminated_count
     for value, potential_cells in potential_cells_by_value.items():
         if len(potential_cells) == 1:
             # Only option, set it
-            cell_index = next(iter(potential_cells))
-            grid.set_value_at(cell_index.col, cell_index.row, value)
+            grid.set_cell_value(next(iter(potential_cells)), value)
             updated = True
+    if stats is not None:
+        stats.record_eliminations("hidden_single", grid.eliminated_count - eliminated_count)
 
     # Parse tuples from cell options
-    tuples = tuples_from_cell_options(cells_by_options)
+    eliminated_count = grid.eliminated_count
+    updated = apply_tuples(grid, siblings, tuples_from_cell_options(cells_by_options)) or updated
+    if stats is not None:
+        stats.record_eliminations("naked_tuple", grid.eliminated_count - eliminated_count)
 
     # Parse tuples from value options (stop at a pair for sanity)
-    tuples |= tuples_from_value_options(potential_cells_by_value)
+    eliminated_count = grid.eliminated_count
+    updated = apply_tuples(grid, siblings, tuples_from_value_options(potential_cells_by_value)) or updated
+    if stats is not None:
+        stats.record_eliminations("hidden_tuple", grid.eliminated_count - eliminated_count)
+    return updated
 
+
+def apply_tuples(grid: Grid, siblings: Tuple[int, ...], tuples: Dict[FrozenSet[int], Set[int]]) -> bool:
+    """
+    Restrict each tuple's cells to the tuple's options and remove those options from the rest of the scope.
+
+    :param grid:        The grid to process
+    :param siblings:    The cell ids that make up the scope
+    :param tuples:      Sets of options mapped to the cells that must provide them
+    :returns:           True if the grid was modified
+    """
+    updated = False
     for options, cells in tuples.items():
         for cell in cells:
-            current_options = grid.options[cell.col][cell.row]
-            if len(current_options) != len(options):
-                grid.options[cell.col][cell.row] = list(options)
+            current_options = grid.options[cell]
+            # Only narrow the options; cells set earlier in this pass must not regain any
+            tuple_options = [option for option in current_options if option in options]
+            if len(current_options) != len(tuple_options):
+                if len(tuple_options) == 0:
+                    raise NoOptionsError(f"Removed last option for cell: {describe_cell(cell)}")
+                grid.set_options_at(cell, tuple_options)
                 updated = True
 
-        other_cells = list(filter(lambda x, tuple_cells=frozenset(cells): x not in tuple_cells, siblings))
+        other_cells = [cell for cell in siblings if cell not in cells]
         updated = grid.remove_options(list(options), other_cells) or updated
     return updated
 
 
-def reduce_block_options(grid: Grid, siblings: List[CellIndex]) -> bool:
+def reduce_block_options(grid: Grid, line: int, stats: SolveStats | None = None) -> bool:
     """
     Process a row or column and detect if a value can only be provided by members of a single block.
     If so, it must be provided by the sibling members of the block and no other non-siblings members of the block
     may have that value as an option.
 
-    :param grid:        The grid
-    :param siblings:    The row or column sibling cells
+    :param grid:    The grid
+    :param line:    The scope index of the row or column
+    :param stats:   Optional statistics to record eliminations in
     :return:    True if the grid was modified
     """
     updated = False
+    eliminated_count = grid.eliminated_count
     potential_blocks_by_value: Dict[int, Set[int]] = dict(map(lambda x: (x, set()), range(1,10)))
-    for sibling_cell in siblings:
-        block_index = get_block_index(sibling_cell.col, sibling_cell.row)
-        for sibling_option in grid.options[sibling_cell.col][sibling_cell.row]:
+    for sibling_cell in scopes[line]:
+        block_index = cell_blocks[sibling_cell]
+        for sibling_option in grid.options[sibling_cell]:
             potential_blocks_by_value[sibling_option].add(block_index)
+    other_block_members = block_minus_line[line]
     for value, potential_blocks in potential_blocks_by_value.items():
         if len(potential_blocks) == 1:
-            other_block_members = filter(lambda cell: cell not in siblings, blocks[potential_blocks.pop()])
-            updated = grid.remove_options([value], other_block_members) or updated
+            updated = grid.remove_options([value], other_block_members[potential_blocks.pop()]) or updated
 
+    if stats is not None:
+        stats.record_eliminations("pointing", grid.eliminated_count - eliminated_count)
     return updated
 
-def reduce_row_and_column_options(grid: Grid, siblings: List[CellIndex]) -> bool:
+def reduce_row_and_column_options(grid: Grid, block: int, stats: SolveStats | None = None) -> bool:
     """
     Process a block sibling set and detect if a value can only be provided by a single row or column segment of
     this block.  If so, then it must be provided by this block's members for the given row or segment, meaning that
     no other member of the row or column outside of this block may have that value as an option.
 
-    :param grid:        The grid
-    :param siblings:    The block sibling cells
-    :return:            True if the grid was modified
+    :param grid:    The grid
+    :param block:   The index of the block
+    :param stats:   Optional statistics to record eliminations in
+    :return:        True if the grid was modified
     """
     updated = False
+    eliminated_count = grid.eliminated_count
     potential_cols_by_value: Dict[int, Set[int]] = dict(map(lambda x: (x, set()), range(1,10)))
     potential_rows_by_value: Dict[int, Set[int]] = dict(map(lambda x: (x, set()), range(1,10)))
-    for sibling_cell in siblings:
-        for sibling_option in grid.options[sibling_cell.col][sibling_cell.row]:
-            potential_cols_by_value[sibling_option].add(sibling_cell.col)
-            potential_rows_by_value[sibling_option].add(sibling_cell.row)
+    for sibling_cell in blocks[block]:
+        for sibling_option in grid.options[sibling_cell]:
+            potential_cols_by_value[sibling_option].add(cell_cols[sibling_cell])
+            potential_rows_by_value[sibling_option].add(cell_rows[sibling_cell])
+    other_line_members = line_minus_block[block]
     for value, potential_cols in potential_cols_by_value.items():
         if len(potential_cols) == 1:
-            other_col_members = list(filter(lambda cell: cell not in siblings, columns[potential_cols.pop()]))
-            updated = grid.remove_options([value], other_col_members) or updated
+            updated = grid.remove_options([value], other_line_members[potential_cols.pop()]) or updated
     for value, potential_rows in potential_rows_by_value.items():
         if len(potential_rows) == 1:
-            other_row_members = list(filter(lambda cell: cell not in siblings, rows[potential_rows.pop()]))
-            updated = grid.remove_options([value], other_row_members) or updated
+            updated = grid.remove_options([value], other_line_members[ROW_SCOPE_OFFSET + potential_rows.pop()]) or updated
 
+    if stats is not None:
+        stats.record_eliminations("claiming", grid.eliminated_count - eliminated_count)
     return updated
 
-def tuples_from_cell_options(cells_by_options: Dict[FrozenSet[int], Set[CellIndex]]) -> Dict[FrozenSet[int], Set[CellIndex]]:
-    tuples: Dict[FrozenSet[int], Set[CellIndex]] = {}
+def tuples_from_cell_options(cells_by_options: Dict[FrozenSet[int], Set[int]]) -> Dict[FrozenSet[int], Set[int]]:
+    tuples: Dict[FrozenSet[int], Set[int]] = {}
     for options, cells in cells_by_options.items():
         if len(options) == len(cells):
             tuples[options] = cells
     return tuples
 
-def tuples_from_value_options(potential_cells_by_value: Dict[int, Set[CellIndex]]) -> Dict[FrozenSet[int], Set[CellIndex]]:
-    tuples: Dict[FrozenSet[int], Set[CellIndex]] = {}
+def tuples_from_value_options(potential_cells_by_value: Dict[int, Set[int]]) -> Dict[FrozenSet[int], Set[int]]:
+    tuples: Dict[FrozenSet[int], Set[int]] = {}
     for value, potential_cells in potential_cells_by_value.items():
         if len(potential_cells) != 2:
             continue
@@ -341,17 +702,17 @@ def tuples_from_value_options(potential_cells_by_value: Dict[int, Set[CellIndex]
     return tuples
 
 def get_block_index(col: int, row: int) -> int:
-    return 3 * _get_block_segment(col) + _get_block_segment(row)
+    return cell_blocks[cell_index(col, row)]
 
 
-def load_grids() -> Generator[Grid, None, None]:
+def load_grids(path: str = GRID_FILE) -> Generator[Grid, None, None]:
     grid: Grid
     row: int = 0
-    with open("p096_sudoku.txt", "r") as source_file:
+    with open(path, "r") as source_file:
         for line in source_file:
             if line.startswith("Grid"):
                 print(f"Solving: {line}")
-                grid = Grid()
+                grid = Grid(line.strip())
                 row = 0
                 continue
             for col, value in enumerate(line):
@@ -364,28 +725,72 @@ def load_grids() -> Generator[Grid, None, None]:
             if row >= 9:
                 yield grid
 
-def _get_block_segment(index: int) -> int:
-    if 0 <= index < 3:
-        return 0
-    elif 3 <= index < 6:
-        return 1
-    else:
-        return 2
+def solve_all(path: str = GRID_FILE) -> int:
+    """
+    :param path:    The grid file
+    :return: The sum of the 3-digit numbers in the top left corner of every solved grid
+    """
+    result = 0
+    for current_grid in load_grids(path):
+        solve(current_grid)
+        result += int(f"{current_grid.value_at(0, 0)}{current_grid.value_at(1, 0)}{current_grid.value_at(2, 0)}")
+    return result
+
+def solve_all_batch(path: str = GRID_FILE) -> int:
+    """
+    solve_all() with the singles of every grid propagated at once.  Needs NumPy, see sudoku_batch.py.
+
+    :param path:    The grid file
+    :return: The sum of the 3-digit numbers in the top left corner of every solved grid
+    """
+    from sudoku_batch import load_puzzles, solve_batch
+    names, puzzles = load_puzzles(path)
+    batch = solve_batch(puzzles, names)
+    if batch.unsolvable.any():
+        raise NoOptionsError(f"Cannot solve grid: {names[int(batch.unsolvable.argmax())]}")
+    return sum(int("".join(map(str, solution[0:3]))) for solution in batch.solutions.tolist())
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve the Project Euler problem 96 Su Doku grids")
+    parser.add_argument("--stats", help="write per-puzzle solver statistics to this file as JSON lines")
+    parser.add_argument("--timeout", type=float, help="give up on a grid after this many seconds")
+    parser.add_argument("--max-nodes", type=int, help="give up on a grid after propagating this many guesses")
+    args = parser.parse_args()
+    budgeted = args.timeout is not None or args.max_nodes is not None
 
     result = 0
+    abandoned = 0
     start_time = time.time()
 
-    for current_grid in load_grids():
-        print(current_grid)
-        solve(current_grid)
-        print("Solution:")
-        print(current_grid)
+    with open(args.stats, "w") if args.stats else nullcontext() as stats_file:
+        for current_grid in load_grids():
+            print(current_grid)
+            grid_stats = SolveStats(current_grid.name) if stats_file is not None or budgeted else None
+            if budgeted:
+                outcome = solve_with_budget(current_grid, SolveBudget(args.timeout, args.max_nodes), grid_stats)
+                solved = outcome.solved
+            else:
+                solve(current_grid, grid_stats)
+                solved = True
+            if stats_file is not None:
+                stats_file.write((json.dumps(outcome.to_record()) if budgeted else grid_stats.to_json()) + "\n")
+
+            # An abandoned grid's top-left digits may still be blank, so it is left out of the result
+            if not solved:
+                abandoned += 1
+                print(f"Gave up ({outcome.status}) after {outcome.nodes} nodes, {outcome.filled_cells()} cells filled")
+                continue
+            print("Solution:")
+            print(current_grid)
 
-        grid_value = f"{current_grid.values[0][0]}{current_grid.values[1][0]}{current_grid.values[2][0]}"
-        result += int(grid_value)
+            grid_value = f"{current_grid.value_at(0, 0)}{current_grid.value_at(1, 0)}{current_grid.value_at(2, 0)}"
+            result += int(grid_value)
 
     end_time = time.time()
 
+    if abandoned:
+        print(f"Abandoned: {abandoned}")
     print(f"Result: {result}\nTime: {end_time - start_time}")
+    if abandoned:
+        sys.exit(1)
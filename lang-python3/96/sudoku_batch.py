@@ -0,0 +1,205 @@
+import argparse
+import time
+from abc import ABCMeta
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from problem_96 import GRID_FILE, Grid, NoOptionsError, all_cells, cell_scopes, scopes, solve
+
+
+# Batch propagation for large corpora of puzzles.  N puzzles are held as an (N, 81) array of candidate masks, bit
+# d - 1 set while digit d is still possible in a cell, and naked and hidden singles are applied to every puzzle at once
+# with reductions over the 27 units.  Most easy and medium puzzles are finished by the singles alone; only those left
+# with open cells are copied into a Grid for the scalar solver's tuples, pointing, and guess-and-check.
+#
+# This module needs NumPy, installed with the project's "batch" extra.
+
+ALL_DIGITS: int = 0b111111111
+# UNITS[unit] holds the unit's 9 cells (scope order: columns, rows, blocks); CELL_UNITS[cell] the cell's 3 units
+UNITS: np.ndarray = np.array(scopes, dtype=np.intp)
+CELL_UNITS: np.ndarray = np.array(cell_scopes, dtype=np.intp)
+# The number of digits in each mask, and the digit of each single-digit mask (0 otherwise)
+BIT_COUNTS: np.ndarray = np.array([bin(mask).count("1") for mask in range(0, ALL_DIGITS + 1)], dtype=np.uint8)
+MASK_DIGITS: np.ndarray = np.array([mask.bit_length() if BIT_COUNTS[mask] == 1 else 0
+                                    for mask in range(0, ALL_DIGITS + 1)], dtype=np.uint8)
+
+
+def load_puzzles(path: str = GRID_FILE) -> Tuple[List[str], np.ndarray]:
+    """
+    :param path:    A grid file in the p096_sudoku.txt format
+    :return: The name of each grid, and their values as an (N, 81) array with 0 for the blanks
+    """
+    names: List[str] = []
+    puzzles: List[List[int]] = []
+    with open(path, "r") as source_file:
+        for line in source_file:
+            line = line.strip()
+            if line.startswith("Grid"):
+                names.append(line)
+                puzzles.append([])
+            elif line:
+                puzzles[-1].extend(int(value) for value in line)
+    return names, np.array(puzzles, dtype=np.uint8).reshape(-1, 81)
+
+
+def candidate_masks(puzzles: np.ndarray) -> np.ndarray:
+    """
+    :param puzzles: An (N, 81) array of cell values, 0 for the blanks
+    :return: The (N, 81) candidate masks: the clue's bit for a given cell, every digit for a blank
+    """
+    puzzles = np.asarray(puzzles, dtype=np.uint16)
+    clue_masks = np.left_shift(np.uint16(1), np.maximum(puzzles, 1) - 1).astype(np.uint16)
+    return np.where(puzzles > 0, clue_masks, np.uint16(ALL_DIGITS)).astype(np.uint16)
+
+
+def _propagate_once(candidates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One round of naked and hidden singles over every unit of every puzzle.
+
+    :param candidates:  An (M, 81) array of candidate masks
+    :return: The narrowed masks, and for each puzzle whether it has reached a contradiction
+    """
+    counts = BIT_COUNTS[candidates]
+    unit_masks = candidates[:, UNITS]
+    unit_counts = counts[:, UNITS]
+
+    # Naked singles: the digits placed in each unit are removed from the unit's other cells.  Two cells of a unit
+    # holding the same digit show up as fewer placed digits than placed cells.
+    placed = np.where(unit_counts == 1, unit_masks, np.uint16(0))
+    unit_placed = np.bitwise_or.reduce(placed, axis=2)
+    duplicated = (BIT_COUNTS[unit_placed] != (unit_counts == 1).sum(axis=2)).any(axis=1)
+    peer_placed = np.bitwise_or.reduce(unit_placed[:, CELL_UNITS], axis=2)
+    narrowed = np.where(counts == 1, candidates, candidates & ~peer_placed).astype(np.uint16)
+
+    # Hidden singles: a digit possible in exactly one cell of a unit belongs to that cell
+    unit_masks = narrowed[:, UNITS]
+    once = np.zeros(unit_masks.shape[0:2], dtype=np.uint16)
+    twice = np.zeros(unit_masks.shape[0:2], dtype=np.uint16)
+    for member in range(0, 9):
+        twice |= once & unit_masks[:, :, member]
+        once |= unit_masks[:, :, member]
+    unique = once & ~twice
+    hidden = np.bitwise_or.reduce(unique[:, CELL_UNITS], axis=2) & narrowed
+    narrowed = np.where(hidden != 0, hidden, narrowed).astype(np.uint16)
+
+    # A cell with no digit left, a digit with no cell left in some unit, or a cell that is the only place for two digits
+    contradicted = duplicated | (narrowed == 0).any(axis=1) | (once != ALL_DIGITS).any(axis=1) | \
+        (BIT_COUNTS[hidden] > 1).any(axis=1)
+    return narrowed, contradicted
+
+
+def propagate_batch(candidates: np.ndarray) -> np.ndarray:
+    """
+    Apply singles to every puzzle until none of them changes.  Each round only works on the puzzles the previous round
+    changed, so a batch of mostly easy puzzles shrinks as they settle.
+
+    :param candidates:  An (N, 81) array of candidate masks, narrowed in place
+    :return: Whether each puzzle reached a contradiction
+    """
+    contradicted = np.zeros(candidates.shape[0], dtype=bool)
+    live = np.arange(candidates.shape[0])
+    while live.size:
+        narrowed, live_contradicted = _propagate_once(candidates[live])
+        changed = (narrowed != candidates[live]).any(axis=1)
+        candidates[live] = narrowed
+        contradicted[live] = live_contradicted
+        live = live[changed & ~live_contradicted]
+    return contradicted
+
+
+def grid_from_masks(masks: Sequence[int], name: str = "") -> Grid:
+    """
+    :param masks:   The 81 candidate masks of one puzzle
+    :param name:    The grid's name
+    :return: A grid with the masks' placed digits set and its other cells narrowed to the masks' candidates
+    """
+    grid = Grid(name)
+    for cell in all_cells:
+        digit = int(MASK_DIGITS[masks[cell]])
+        if digit:
+            grid.set_cell_value(cell, digit)
+    for cell in all_cells:
+        if grid.values[cell] == 0:
+            options = [option for option in grid.options[cell] if int(masks[cell]) >> (option - 1) & 1]
+            if len(options) != len(grid.options[cell]):
+                if not options:
+                    raise NoOptionsError(f"No options left for cell {cell} of {name}")
+                grid.set_options_at(cell, options)
+    return grid
+
+
+class BatchSolution(metaclass=ABCMeta):
+    """
+    The outcome of solve_batch() for every puzzle of the batch.  Rows of unsolvable puzzles in solutions are zero.
+    """
+    solutions: np.ndarray  # (N, 81) cell values
+    searched: np.ndarray  # whether each puzzle needed the scalar solver
+    unsolvable: np.ndarray  # whether each puzzle has no solution
+
+    def __init__(self, solutions: np.ndarray, searched: np.ndarray, unsolvable: np.ndarray) -> None:
+        super().__init__()
+        self.solutions = solutions
+        self.searched = searched
+        self.unsolvable = unsolvable
+
+
+def solve_batch(puzzles: np.ndarray, names: Sequence[str] | None = None) -> BatchSolution:
+    """
+    Propagate singles through the whole batch, then finish the puzzles with open cells one at a time with solve().
+    A puzzle without a solution is marked as such rather than failing the batch.
+
+    :param puzzles: An (N, 81) array of cell values, 0 for the blanks
+    :param names:   [optional] The puzzles' names, given to the grids of the scalar solver
+    :return: The solution of each puzzle, and which puzzles needed the scalar solver or have no solution
+    """
+    candidates = candidate_masks(puzzles)
+    unsolvable = propagate_batch(candidates)
+
+    solutions = MASK_DIGITS[candidates]
+    searched = (solutions == 0).any(axis=1) & ~unsolvable
+    for index in np.flatnonzero(searched):
+        try:
+            grid = grid_from_masks(candidates[index], names[index] if names is not None else str(index))
+            solve(grid)
+            solutions[index] = grid.values
+        except NoOptionsError:
+            unsolvable[index] = True
+    solutions[unsolvable] = 0
+    return BatchSolution(solutions, searched, unsolvable)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve Su Doku grids in batches with vectorized singles")
+    parser.add_argument("--path", default=GRID_FILE, help="a grid file in the p096_sudoku.txt format")
+    parser.add_argument("--copies", type=int, default=1, help="solve this many copies of the grids as one batch")
+    parser.add_argument("--compare", action="store_true", help="also time the scalar solver on the same grids")
+    args = parser.parse_args()
+
+    grid_names, grid_values = load_puzzles(args.path)
+    grid_names = grid_names * args.copies
+    grid_values = np.tile(grid_values, (args.copies, 1))
+
+    start_time = time.time()
+    batch = solve_batch(grid_values, grid_names)
+    end_time = time.time()
+    solved_values = batch.solutions
+    result = int((solved_values[:, 0:3].astype(np.int64) * np.array([100, 10, 1])).sum())
+    print(f"Grids: {len(grid_names)}\nScalar fallbacks: {int(batch.searched.sum())}\n"
+          f"Unsolvable: {int(batch.unsolvable.sum())}")
+
+    if args.compare:
+        scalar_start_time = time.time()
+        for grid_index, (grid_name, values) in enumerate(zip(grid_names, grid_values)):
+            scalar_grid = Grid(grid_name)
+            for grid_cell in all_cells:
+                scalar_grid.set_cell_value(grid_cell, int(values[grid_cell]))
+            try:
+                solve(scalar_grid)
+            except NoOptionsError:
+                scalar_grid.values = [0] * len(all_cells)
+            if scalar_grid.values != solved_values[grid_index].tolist():
+                raise RuntimeError(f"Batch and scalar solutions differ for {grid_name}")
+        print(f"Scalar time: {time.time() - scalar_start_time}")
+
+    print(f"Result: {result}\nTime: {end_time - start_time}")
@@ -0,0 +1,327 @@
+import random
+import time
+from abc import ABCMeta
+from collections import OrderedDict
+from itertools import permutations, product
+from typing import List, Sequence, Tuple, Dict, Optional
+
+from problem_96 import Grid, SolveStats, all_cells, load_grids, solve
+
+
+# Two Su Doku puzzles are equivalent if one can be turned into the other by relabelling the digits, permuting the
+# rows within a band (or the bands themselves), permuting the columns within a stack (or the stacks themselves), and
+# transposing the grid.  Every puzzle is mapped to the lexicographically smallest of its equivalent forms, reading the
+# grid row by row with digits relabelled in order of first appearance, so that equivalent puzzles share a cache key.
+
+# COLUMN_ORDERS[n][j] is the original column placed at canonical column j
+COLUMN_ORDERS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(3 * stack + offset for stack, offsets in zip(stack_order, stack_offsets) for offset in offsets)
+    for stack_order in permutations(range(0, 3))
+    for stack_offsets in product(permutations(range(0, 3)), repeat=3))
+
+
+class SudokuTransform(metaclass=ABCMeta):
+    """
+    A symmetry of the Su Doku grid together with a digit relabelling.
+    Canonical cell (i, j) holds labels[value] of the (possibly transposed) original cell (row_order[i], col_order[j]).
+    """
+    transposed: bool
+    row_order: Tuple[int, ...]
+    col_order: Tuple[int, ...]
+    labels: Tuple[int, ...]  # labels[original digit] = canonical digit, labels[0] == 0
+
+    def __init__(self, transposed: bool, row_order: Tuple[int, ...], col_order: Tuple[int, ...],
+                 labels: Tuple[int, ...]) -> None:
+        super().__init__()
+        self.transposed = transposed
+        self.row_order = row_order
+        self.col_order = col_order
+        self.labels = labels
+
+    def _source_cell(self, canonical_cell: int) -> int:
+        row = self.row_order[canonical_cell // 9]
+        col = self.col_order[canonical_cell % 9]
+        return 9 * col + row if self.transposed else 9 * row + col
+
+    def apply(self, values: Sequence[int]) -> List[int]:
+        """
+        :param values:  Original cell values, indexed by cell id
+        :return:    The canonical cell values
+        """
+        return [self.labels[values[self._source_cell(cell)]] for cell in all_cells]
+
+    def invert(self, canonical_values: Sequence[int]) -> List[int]:
+        """
+        :param canonical_values:    Canonical cell values, indexed by cell id
+        :return:    The original cell values
+        """
+        original_digits = [0] * len(self.labels)
+        for digit, label in enumerate(self.labels):
+            original_digits[label] = digit
+
+        values = [0] * len(all_cells)
+        for cell in all_cells:
+            values[self._source_cell(cell)] = original_digits[canonical_values[cell]]
+        return values
+
+
+def canonicalize(values: Sequence[int],
+                 max_candidates: int | None = None) -> Optional[Tuple[str, SudokuTransform]]:
+    """
+    Find the minimal lexicographic form of a puzzle under the Su Doku symmetries.
+
+    The canonical grid is built one row at a time.  The first row's best zero pattern is known without search, and
+    each later row keeps only the candidate transforms that produce the smallest row so far, so only ties are carried
+    forward.  Candidates that have used the same rows with the same column order and labels are interchangeable and
+    are merged.  Sparse puzzles leave many ties at every row, so the number carried forward can be bounded.
+
+    :param values:          The puzzle's cell values (0 for unknown), indexed by cell id
+    :param max_candidates:  [optional] Give up once more candidate transforms than this are tied
+    :return:    The canonical form as an 81 character string, and the transform that produces it; or None if the
+                candidates exceeded max_candidates
+    """
+    oriented_rows: Tuple[List[Tuple[int, ...]], List[Tuple[int, ...]]] = (
+        [tuple(values[9 * row + col] for col in range(0, 9)) for row in range(0, 9)],
+        [tuple(values[9 * row + col] for row in range(0, 9)) for col in range(0, 9)],
+    )
+
+    # The digits of a row are distinct, so its relabelled form only depends upon where its zeros are placed
+    best_pattern = min(_best_zero_pattern(row) for rows in oriented_rows for row in rows)
+    # Candidate: (transposed, row order, column order, labels, next label)
+    candidates: List[Tuple[int, Tuple[int, ...], Tuple[int, ...], List[int], int]] = []
+    for transposed, rows in enumerate(oriented_rows):
+        for row_index, row in enumerate(rows):
+            if _best_zero_pattern(row) != best_pattern:
+                continue
+            for col_order in _best_column_orders(row):
+                _relabelled, labels, next_label = _relabel(row, col_order, [0] * 10, 1)
+                candidates.append((transposed, (row_index,), col_order, labels, next_label))
+                if max_candidates is not None and len(candidates) > max_candidates:
+                    return None
+    canonical: List[int] = list(_relabel(oriented_rows[candidates[0][0]][candidates[0][1][0]], candidates[0][2],
+                                         [0] * 10, 1)[0])
+
+    for _level in range(1, 9):
+        best_row: Optional[Tuple[int, ...]] = None
+        survivors: Dict[Tuple, Tuple[int, Tuple[int, ...], Tuple[int, ...], List[int], int]] = {}
+        for transposed, row_order, col_order, labels, next_label in candidates:
+            for row_index in _next_rows(row_order):
+                relabelled, next_labels, following_label = _relabel(oriented_rows[transposed][row_index], col_order,
+                                                                     labels, next_label)
+                if best_row is not None and relabelled > best_row:
+                    continue
+                if best_row is None or relabelled < best_row:
+                    best_row = relabelled
+                    survivors = {}
+                next_order = row_order + (row_index,)
+                key = (transposed, tuple(sorted(next_order)), col_order, tuple(next_labels))
+                if key not in survivors:
+                    survivors[key] = (transposed, next_order, col_order, next_labels, following_label)
+                    if max_candidates is not None and len(survivors) > max_candidates:
+                        return None
+        canonical.extend(best_row)
+        candidates = list(survivors.values())
+
+    transposed, row_order, col_order, labels, next_label = candidates[0]
+    labels = list(labels)
+    for digit in range(1, 10):
+        # Digits missing from the puzzle take the remaining labels so that solutions map back one-to-one
+        if not labels[digit]:
+            labels[digit] = next_label
+            next_label += 1
+    return "".join(map(str, canonical)), SudokuTransform(bool(transposed), row_order, col_order, tuple(labels))
+
+
+def _best_zero_pattern(row: Sequence[int]) -> Tuple[int, ...]:
+    """
+    :param row: The values of a row
+    :return:    The smallest clue pattern (1 for a clue) the row can be arranged into by column permutations
+    """
+    clue_counts = sorted(sum(1 for value in row[3 * stack:3 * stack + 3] if value) for stack in range(0, 3))
+    return tuple(1 if offset >= 3 - count else 0 for count in clue_counts for offset in range(0, 3))
+
+
+def _best_column_orders(row: Sequence[int]) -> List[Tuple[int, ...]]:
+    """
+    :param row: The values of a row
+    :return:    Every column order that arranges the row into its best clue pattern
+    """
+    clue_counts = [sum(1 for value in row[3 * stack:3 * stack + 3] if value) for stack in range(0, 3)]
+    col_orders: List[Tuple[int, ...]] = []
+    for stack_order in permutations(range(0, 3)):
+        if [clue_counts[stack] for stack in stack_order] != sorted(clue_counts):
+            continue
+        # Within each stack the empty cells come first
+        stack_offsets = [[offsets for offsets in permutations(range(0, 3))
+                          if [1 if row[3 * stack + offset] else 0 for offset in offsets] ==
+                          sorted(1 if row[3 * stack + offset] else 0 for offset in range(0, 3))]
+                         for stack in stack_order]
+        for chosen_offsets in product(*stack_offsets):
+            col_orders.append(tuple(3 * stack + offset
+                                    for stack, offsets in zip(stack_order, chosen_offsets) for offset in offsets))
+    return col_orders
+
+
+def _relabel(row: Sequence[int], col_order: Tuple[int, ...], labels: List[int],
+             next_label: int) -> Tuple[Tuple[int, ...], List[int], int]:
+    """
+    Reorder and relabel a row, assigning new labels to digits in order of first appearance.
+
+    :return:    The relabelled row, the (copied if extended) labels, and the next unused label
+    """
+    relabelled: List[int] = []
+    copied = False
+    for col in col_order:
+        value = row[col]
+        if value and not labels[value]:
+            if not copied:
+                labels = list(labels)
+                copied = True
+            labels[value] = next_label
+            next_label += 1
+        relabelled.append(labels[value])
+    return tuple(relabelled), labels, next_label
+
+
+def _next_rows(row_order: Tuple[int, ...]) -> List[int]:
+    """
+    :param row_order:   The rows already placed
+    :return:    The rows that may be placed next while keeping bands together
+    """
+    if len(row_order) % 3 != 0:
+        band = row_order[-1] // 3
+        return [row for row in range(3 * band, 3 * band + 3) if row not in row_order]
+    used_bands = {row // 3 for row in row_order}
+    return [row for row in range(0, 9) if row // 3 not in used_bands]
+
+
+class SolutionCache(metaclass=ABCMeta):
+    """
+    Least-recently-used cache of solutions.  Every solution is stored under the puzzle exactly as given, so an exact
+    repeat costs one hash lookup.  Puzzles that canonicalize within max_candidates are also stored in canonical form,
+    so that an equivalent puzzle is answered by mapping the solution back through its transform; the bound keeps the
+    canonicalization of sparse puzzles from costing more than solving them.
+    """
+    capacity: int
+    max_candidates: int | None
+    exact_hits: int
+    equivalent_hits: int
+    misses: int
+    _exact_solutions: "OrderedDict[str, List[int]]"
+    _solutions: "OrderedDict[str, List[int]]"
+
+    def __init__(self, capacity: int = 4096, max_candidates: int | None = 256) -> None:
+        """
+        :param capacity:        The number of solutions kept in each form
+        :param max_candidates:  Skip the canonical form of puzzles tying more candidate transforms than this
+        """
+        super().__init__()
+        self.capacity = capacity
+        self.max_candidates = max_candidates
+        self.exact_hits = 0
+        self.equivalent_hits = 0
+        self.misses = 0
+        self._exact_solutions = OrderedDict()
+        self._solutions = OrderedDict()
+
+    @property
+    def hits(self) -> int:
+        return self.exact_hits + self.equivalent_hits
+
+    def get_exact(self, puzzle_key: str) -> Optional[List[int]]:
+        return self._get(self._exact_solutions, puzzle_key)
+
+    def put_exact(self, puzzle_key: str, solution: List[int]) -> None:
+        self._put(self._exact_solutions, puzzle_key, solution)
+
+    def get(self, key: str) -> Optional[List[int]]:
+        return self._get(self._solutions, key)
+
+    def put(self, key: str, canonical_solution: List[int]) -> None:
+        self._put(self._solutions, key, canonical_solution)
+
+    @staticmethod
+    def _get(solutions: "OrderedDict[str, List[int]]", key: str) -> Optional[List[int]]:
+        solution = solutions.get(key)
+        if solution is not None:
+            solutions.move_to_end(key)
+        return solution
+
+    def _put(self, solutions: "OrderedDict[str, List[int]]", key: str, solution: List[int]) -> None:
+        solutions[key] = solution
+        solutions.move_to_end(key)
+        while len(solutions) > self.capacity:
+            solutions.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._exact_solutions)
+
+
+def solve_with_cache(grid: Grid, cache: SolutionCache, stats: SolveStats | None = None) -> None:
+    """
+    Solve the grid in place, reusing the cached solution of the same puzzle or of any equivalent one.  The puzzle is
+    only canonicalized when it is not an exact repeat.
+
+    :param grid:    A grid holding only the puzzle's clues
+    :param cache:   The cache to read from and populate
+    :param stats:   Optional statistics to collect when the puzzle has to be solved
+    """
+    puzzle_key = "".join(map(str, grid.values))
+    solution = cache.get_exact(puzzle_key)
+    if solution is not None:
+        cache.exact_hits += 1
+        grid.values = list(solution)
+        grid.options = [[] for _cell in all_cells]
+        return
+
+    canonical = canonicalize(grid.values, cache.max_candidates)
+    if canonical is not None:
+        key, transform = canonical
+        canonical_solution = cache.get(key)
+        if canonical_solution is not None:
+            cache.equivalent_hits += 1
+            grid.values = transform.invert(canonical_solution)
+            grid.options = [[] for _cell in all_cells]
+            cache.put_exact(puzzle_key, list(grid.values))
+            return
+
+    cache.misses += 1
+    solve(grid, stats)
+    cache.put_exact(puzzle_key, list(grid.values))
+    if canonical is not None:
+        cache.put(key, transform.apply(grid.values))
+
+
+def random_equivalent(values: Sequence[int], rng: random.Random) -> List[int]:
+    """
+    :return:    A random puzzle equivalent to the given one
+    """
+    bands = rng.sample(range(0, 3), 3)
+    row_order = tuple(3 * band + offset for band in bands for offset in rng.sample(range(0, 3), 3))
+    col_order = rng.choice(COLUMN_ORDERS)
+    labels = tuple([0] + rng.sample(range(1, 10), 9))
+    return SudokuTransform(rng.random() < 0.5, row_order, col_order, labels).apply(values)
+
+
+if __name__ == "__main__":
+    solution_cache = SolutionCache()
+    random_generator = random.Random(96)
+    puzzles = [list(grid.values) for grid in load_grids()]
+    # Every puzzle is followed by an equivalent one, answered from the cache if the puzzle canonicalizes within the
+    # bound, and then by an exact repeat, which always is
+    puzzles = [puzzle for original in puzzles
+               for puzzle in (original, random_equivalent(original, random_generator), original)]
+
+    start_time = time.time()
+    for puzzle in puzzles:
+        current_grid = Grid()
+        for cell, clue in enumerate(puzzle):
+            current_grid.set_cell_value(cell, clue)
+        solve_with_cache(current_grid, solution_cache)
+        assert current_grid.is_solved()
+        assert all(clue == 0 or clue == value for clue, value in zip(puzzle, current_grid.values))
+    end_time = time.time()
+
+    print(f"Puzzles: {len(puzzles)}\nExact hits: {solution_cache.exact_hits}\n"
+          f"Equivalent hits: {solution_cache.equivalent_hits}\nMisses: {solution_cache.misses}\n"
+          f"Time: {end_time - start_time}")
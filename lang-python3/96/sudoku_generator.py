@@ -0,0 +1,192 @@
+import argparse
+import math
+import random
+import time
+from typing import List, Sequence, Tuple, Dict
+
+from problem_96 import Grid, NoOptionsError, SolveStats, all_cells, count_solutions, propagate, solve
+
+
+# Puzzles are graded by the hardest technique the solver needed:
+#   easy    - naked and hidden singles only
+#   medium  - tuples, pointing, or claiming eliminations, but no guessing
+#   hard    - guess-and-check that never had to backtrack
+#   expert  - guess-and-check with at least one backtrack
+DIFFICULTY_TIERS: Tuple[str, ...] = ("easy", "medium", "hard", "expert")
+
+
+def random_solution(rng: random.Random) -> List[int]:
+    """
+    Fill an empty grid by setting random options in random cells, propagating after each one, and starting over on a
+    contradiction.
+
+    :param rng: The random number generator
+    :return:    The values of a complete, valid grid indexed by cell id
+    """
+    while True:
+        grid = Grid()
+        try:
+            while not grid.is_solved():
+                cell = rng.choice([cell for cell in all_cells if grid.values[cell] == 0])
+                grid.set_cell_value(cell, rng.choice(grid.options[cell]))
+                propagate(grid)
+            return grid.values
+        except NoOptionsError:
+            continue
+
+
+def to_grid(puzzle: Sequence[int]) -> Grid:
+    grid = Grid()
+    for cell, value in enumerate(puzzle):
+        grid.set_cell_value(cell, value)
+    return grid
+
+
+def generate_puzzle(rng: random.Random, target_clues: int) -> List[int]:
+    """
+    Remove clues from a random solution in random order, keeping each removal only if the puzzle still has a unique
+    solution, until the target number of clues is reached or no further clue can be removed.
+
+    :param rng:             The random number generator
+    :param target_clues:    The number of clues to stop at
+    :return:    The puzzle's values indexed by cell id, 0 for an empty cell
+    """
+    puzzle = random_solution(rng)
+    clue_count = len(puzzle)
+    removal_order = list(all_cells)
+    rng.shuffle(removal_order)
+    for cell in removal_order:
+        if clue_count <= target_clues:
+            break
+        value = puzzle[cell]
+        puzzle[cell] = 0
+        if count_solutions(to_grid(puzzle)) == 1:
+            clue_count -= 1
+        else:
+            puzzle[cell] = value
+    return puzzle
+
+
+def grade(stats: SolveStats) -> str:
+    """
+    :param stats:   The statistics collected while solving a puzzle
+    :return:    The puzzle's difficulty tier
+    """
+    if stats.backtracks > 0:
+        return "expert"
+    if stats.guesses > 0:
+        return "hard"
+    if any(stats.eliminations[technique] for technique in ("naked_tuple", "hidden_tuple", "pointing", "claiming")):
+        return "medium"
+    return "easy"
+
+
+def grade_puzzle(puzzle: Sequence[int]) -> str:
+    stats = SolveStats()
+    solve(to_grid(puzzle), stats)
+    return grade(stats)
+
+
+def generate_corpus(seed: int, per_tier: int, clue_counts: Sequence[int],
+                    max_attempts: int) -> Dict[str, List[List[int]]]:
+    """
+    Generate puzzles at the given clue counts until every difficulty tier holds the requested number of puzzles, or
+    the attempt limit is reached.  The same seed always produces the same corpus.
+
+    :param seed:            The random seed
+    :param per_tier:        The number of puzzles wanted for each tier
+    :param clue_counts:     The target clue counts to cycle through
+    :param max_attempts:    The maximum number of puzzles to generate
+    :return:    The puzzles grouped by difficulty tier
+    """
+    rng = random.Random(seed)
+    corpus: Dict[str, List[List[int]]] = {tier: [] for tier in DIFFICULTY_TIERS}
+    for attempt in range(0, max_attempts):
+        if all(len(puzzles) >= per_tier for puzzles in corpus.values()):
+            break
+        puzzle = generate_puzzle(rng, clue_counts[attempt % len(clue_counts)])
+        tier_puzzles = corpus[grade_puzzle(puzzle)]
+        if len(tier_puzzles) < per_tier:
+            tier_puzzles.append(puzzle)
+    return corpus
+
+
+def write_corpus(path: str, corpus: Dict[str, List[List[int]]]) -> None:
+    """
+    Write one puzzle per line: the 81 cell values followed by the tier and clue count.
+    """
+    with open(path, "w") as corpus_file:
+        for tier, puzzles in corpus.items():
+            for puzzle in puzzles:
+                clue_count = sum(1 for value in puzzle if value)
+                corpus_file.write(f"{''.join(map(str, puzzle))} {tier} {clue_count}\n")
+
+
+def read_corpus(path: str) -> Dict[str, List[List[int]]]:
+    corpus: Dict[str, List[List[int]]] = {tier: [] for tier in DIFFICULTY_TIERS}
+    with open(path, "r") as corpus_file:
+        for line in corpus_file:
+            fields = line.split()
+            if len(fields) < 2:
+                continue
+            corpus.setdefault(fields[1], []).append([int(value) for value in fields[0]])
+    return corpus
+
+
+def percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """
+    :param sorted_values:   The values in ascending order
+    :param percent:         The percentile, 0-100
+    :return:    The nearest-rank percentile of the values, computed as benchmark.py's percentile() does
+    """
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def benchmark(corpus: Dict[str, List[List[int]]], repetitions: int) -> None:
+    """
+    Solve every puzzle of each tier and print the tier's latency percentiles in milliseconds.
+    """
+    print(f"{'tier':<8} {'count':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    for tier, puzzles in corpus.items():
+        if not puzzles:
+            continue
+        latencies: List[float] = []
+        for _repetition in range(0, repetitions):
+            for puzzle in puzzles:
+                grid = to_grid(puzzle)
+                start = time.perf_counter()
+                solve(grid)
+                latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(f"{tier:<8} {len(puzzles):>6} {percentile(latencies, 50):>9.3f} {percentile(latencies, 90):>9.3f} "
+              f"{percentile(latencies, 99):>9.3f} {latencies[-1]:>9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate graded Su Doku puzzles and benchmark the solver on them")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = subparsers.add_parser("generate", help="generate a graded corpus")
+    generate_parser.add_argument("output", help="the corpus file to write")
+    generate_parser.add_argument("--seed", type=int, default=96)
+    generate_parser.add_argument("--per-tier", type=int, default=20)
+    generate_parser.add_argument("--clues", type=int, nargs="+", default=[22, 24, 26, 28, 32])
+    generate_parser.add_argument("--max-attempts", type=int, default=2000)
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="report solve latency percentiles per tier")
+    benchmark_parser.add_argument("corpus", help="a corpus file written by the generate command")
+    benchmark_parser.add_argument("--repetitions", type=int, default=3)
+
+    args = parser.parse_args()
+    start_time = time.time()
+    if args.command == "generate":
+        generated = generate_corpus(args.seed, args.per_tier, args.clues, args.max_attempts)
+        write_corpus(args.output, generated)
+        for tier_name, tier_puzzles in generated.items():
+            print(f"{tier_name}: {len(tier_puzzles)}")
+    else:
+        benchmark(read_corpus(args.corpus), args.repetitions)
+    end_time = time.time()
+
+    print(f"Time: {end_time - start_time}")
@@ -0,0 +1,215 @@
+import argparse
+import datetime
+import json
+import math
+import platform
+import subprocess
+import time
+from abc import ABCMeta
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Tuple, Sequence
+
+from problems import PROBLEMS, ROOT_DIRECTORY, load_problem, problem_path
+
+
+# Benchmarks the competing solvers of each problem module against each other.  A module's solvers are its functions
+# sharing a name prefix, such as solve_with_brute_force and solve_with_sorted_list_generator, and every solver of a
+# suite is run over the same parameter sweep so that their medians and scaling can be compared.  Results are written
+# as JSON so that runs from different commits can be compared with --compare.
+
+
+class Suite(metaclass=ABCMeta):
+    problem: int
+    parameters: Tuple[Any, ...]
+    make_arguments: Callable[[ModuleType, str, Any], Tuple]
+
+    def __init__(self, problem: int, parameters: Tuple[Any, ...],
+                 make_arguments: Callable[[ModuleType, str, Any], Tuple]):
+        """
+        :param problem:         The problem number
+        :param parameters:      The parameter sweep, in increasing order of cost
+        :param make_arguments:  Builds fresh solver arguments from the module, solver name, and parameter
+        """
+        self.problem = problem
+        self.parameters = parameters
+        self.make_arguments = make_arguments
+
+
+def _input_file_arguments(problem: int) -> Callable[[ModuleType, str, Any], Tuple]:
+    return lambda module, solver, file_name: PROBLEMS[problem].solver_arguments(module, solver, (),
+                                                                                problem_path(problem, file_name))
+
+
+SUITES: Dict[int, Suite] = {suite.problem: suite for suite in [
+    Suite(1, (1000, 10000, 100000, 1000000), lambda module, solver, max_value: (max_value,)),
+    Suite(2, (4000000, 10 ** 9, 10 ** 15), lambda module, solver, max_value: (max_value,)),
+    Suite(4, (2, 3, 4, 5, 6), lambda module, solver, digits: (digits,)),
+    Suite(7, (1000, 10001, 100000), lambda module, solver, prime_idx: (prime_idx,)),
+    Suite(31, (50, 100, 200), lambda module, solver, amount: (amount, [200, 100, 50, 20, 10, 5, 2, 1])),
+    Suite(54, ("0054_poker.txt",), _input_file_arguments(54)),
+    Suite(79, ("0079_keylog.txt",), _input_file_arguments(79)),
+    Suite(96, ("p096_sudoku.txt",), _input_file_arguments(96)),
+]}
+
+
+def percentile(sorted_values: Sequence[int], percent: float) -> int:
+    """
+    :param sorted_values:   The values in ascending order
+    :param percent:         The percentile, 0-100
+    :return: The nearest-rank percentile of the values
+    """
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def time_solver(function: Callable, make_arguments: Callable[[], Tuple], warmup: int, repetitions: int) -> List[int]:
+    """
+    Time repeated calls of a solver after some untimed warm-up calls.  Arguments are built before each call so that
+    solvers that consume or modify their arguments always see fresh ones, and building them is not timed.
+
+    :return: The duration of each timed call in nanoseconds
+    """
+    for _warmup in range(0, warmup):
+        function(*make_arguments())
+
+    samples: List[int] = []
+    for _repetition in range(0, repetitions):
+        arguments = make_arguments()
+        start = time.perf_counter_ns()
+        function(*arguments)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def run_suite(suite: Suite, warmup: int, repetitions: int, max_seconds: float) -> List[Dict[str, Any]]:
+    """
+    Run every solver of the suite over the parameter sweep.  Once a solver's median exceeds max_seconds its larger
+    parameters are skipped.
+
+    :return: One result record per solver and parameter
+    """
+    module = load_problem(suite.problem)
+    results: List[Dict[str, Any]] = []
+    for solver, function in PROBLEMS[suite.problem].find_solvers(module):
+        for parameter in suite.parameters:
+            try:
+                samples = sorted(time_solver(function, lambda: suite.make_arguments(module, solver, parameter),
+                                             warmup, repetitions))
+            except ImportError as error:
+                # A solver needing an optional dependency, such as NumPy for solve_all_batch
+                print(f"Skipping problem {suite.problem} {solver}: {error}")
+                break
+            results.append({
+                "problem": suite.problem,
+                "solver": solver,
+                "parameter": parameter,
+                "samples_ns": samples,
+                "median_ns": percentile(samples, 50),
+                "p90_ns": percentile(samples, 90),
+                "min_ns": samples[0],
+                "max_ns": samples[-1],
+            })
+            if percentile(samples, 50) > max_seconds * 1e9:
+                break
+    return results
+
+
+def scaling_exponents(results: List[Dict[str, Any]]) -> Dict[Tuple[int, str], List[float]]:
+    """
+    Estimate how each solver scales between consecutive numeric parameters, as the slope of log(median) against
+    log(parameter): 1.0 is linear, 2.0 quadratic.
+
+    :return: The slopes of each (problem, solver)
+    """
+    curves: Dict[Tuple[int, str], List[Tuple[float, float]]] = {}
+    for result in results:
+        if isinstance(result["parameter"], (int, float)) and result["median_ns"] > 0:
+            curves.setdefault((result["problem"], result["solver"]), []).append(
+                (float(result["parameter"]), float(result["median_ns"])))
+    return {key: [math.log(later[1] / earlier[1]) / math.log(later[0] / earlier[0])
+                  for earlier, later in zip(points, points[1:])]
+            for key, points in curves.items() if len(points) > 1}
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT_DIRECTORY, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'problem':>7} {'solver':<42} {'parameter':>16} {'median ms':>11} {'p90 ms':>11} {'min ms':>11}")
+    for result in results:
+        print(f"{result['problem']:>7} {result['solver']:<42} {str(result['parameter']):>16} "
+              f"{result['median_ns'] / 1e6:>11.3f} {result['p90_ns'] / 1e6:>11.3f} {result['min_ns'] / 1e6:>11.3f}")
+
+    exponents = scaling_exponents(results)
+    if exponents:
+        print("\nScaling exponents between consecutive parameters:")
+        for (problem, solver), slopes in exponents.items():
+            print(f"{problem:>7} {solver:<42} {' '.join(f'{slope:.2f}' for slope in slopes)}")
+
+
+def compare_results(baseline: Dict[str, Any], results: List[Dict[str, Any]], threshold: float) -> bool:
+    """
+    Print the ratio of each median to the baseline's median for the same problem, solver, and parameter.
+
+    :param baseline:    A report previously written by this module
+    :param results:     The current results
+    :param threshold:   The relative slowdown above which a result counts as a regression
+    :return: True if any result regressed
+    """
+    baseline_medians = {(result["problem"], result["solver"], json.dumps(result["parameter"])): result["median_ns"]
+                        for result in baseline["results"]}
+    regressed = False
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for result in results:
+        baseline_median = baseline_medians.get((result["problem"], result["solver"], json.dumps(result["parameter"])))
+        if not baseline_median:
+            continue
+        ratio = result["median_ns"] / baseline_median
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "REGRESSION"
+            regressed = True
+        print(f"{result['problem']:>7} {result['solver']:<42} {str(result['parameter']):>16} {ratio:>8.2f}x {flag}")
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the competing solvers of each problem module")
+    parser.add_argument("--problems", type=int, nargs="+", default=sorted(SUITES.keys()))
+    parser.add_argument("--warmup", type=int, default=1, help="untimed calls before timing")
+    parser.add_argument("--repetitions", type=int, default=5, help="timed calls per solver and parameter")
+    parser.add_argument("--max-seconds", type=float, default=2.0,
+                        help="skip a solver's larger parameters once its median exceeds this")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare against a JSON file written by --output")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    all_results: List[Dict[str, Any]] = []
+    for problem_number in args.problems:
+        all_results.extend(run_suite(SUITES[problem_number], args.warmup, args.repetitions, args.max_seconds))
+    end_time = time.time()
+
+    print_results(all_results)
+    report = {
+        "commit": current_commit(),
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "warmup": args.warmup,
+        "repetitions": args.repetitions,
+        "results": all_results,
+    }
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    if args.compare:
+        with open(args.compare, "r") as baseline_file:
+            compare_results(json.load(baseline_file), all_results, args.threshold)
+
+    print(f"Time: {end_time - start_time}")
@@ -0,0 +1,148 @@
+import argparse
+import os
+import sys
+import time
+from types import ModuleType
+from typing import Any, Callable, List, Sequence, Tuple
+
+from problems import PROBLEMS, load_problem, problem_path
+
+
+# Command line entry point for running a single problem solver:
+#
+#   euler 7                                              the default solver and parameters
+#   euler 7 1000001 --solver get_nth_prime_div_test      another solver with other parameters
+#   euler 96 --input other_grids.txt                     another input file
+#   euler 79 --list                                      the solvers a problem offers
+#   euler 96 --profile cprofile,memory                   profile the run, see profiling.py
+#   euler 7 1000001 --cache                              reuse the result of an identical earlier run, see memo.py
+#
+# Only the chosen problem's module is imported, so start-up costs the interpreter plus that one module.
+
+
+def parse_parameter(value: str) -> Any:
+    """
+    :param value:   A command line parameter
+    :return: The parameter as a Python literal (number, list, ...) if it is one, otherwise the string itself
+    """
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    # Imported here so that plain numeric parameters never pay for the ast module
+    import ast
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def parse_arguments(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="euler", description="Run a Project Euler problem solver")
+    parser.add_argument("problem", type=int, nargs="?", help="the problem number")
+    parser.add_argument("parameters", nargs="*", help="solver parameters, parsed as Python literals where possible")
+    parser.add_argument("--solver", help="the solver function to run instead of the problem's default")
+    parser.add_argument("--input", help="the input file to read instead of the one shipped with the problem")
+    parser.add_argument("--list", action="store_true", help="list the problems, or the solvers of a problem")
+    parser.add_argument("--profile", nargs="?", const="all", metavar="MODES",
+                        help="profile the run: all, or a comma separated list of time, cprofile, sample, memory "
+                             "(default: the EULER_PROFILE environment variable)")
+    parser.add_argument("--profile-dir", help="the directory to write profiles to (default: EULER_PROFILE_DIR)")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse and store results in the persistent result store (default: EULER_CACHE_PATH)")
+    return parser.parse_args(argv)
+
+
+def list_solvers(problem_number: int | None) -> None:
+    if problem_number is None:
+        for problem in PROBLEMS.values():
+            print(f"{problem.number:>4}  {problem.default_solver}")
+        return
+
+    problem = PROBLEMS[problem_number]
+    for name, _function in problem.find_solvers(load_problem(problem_number)):
+        print(f"{name}{' (default)' if name == problem.default_solver else ''}")
+
+
+def resolve_solver(problem_number: int, solver: str | None) -> Tuple[ModuleType, str, Callable]:
+    """
+    :param problem_number:  The problem number
+    :param solver:          The solver function name, or None for the problem's default
+    :return: The problem's module, and the solver's name and function
+    :raises KeyError: if the problem has no such solver
+    """
+    problem = PROBLEMS[problem_number]
+    module = load_problem(problem_number)
+    solver = solver or problem.default_solver
+    solver_functions = dict(problem.find_solvers(module))
+    if solver not in solver_functions:
+        raise KeyError(f"Unknown solver for problem {problem_number}: {solver}")
+    return module, solver, solver_functions[solver]
+
+
+def run(problem_number: int, solver: str | None, parameters: Tuple[Any, ...], input_path: str | None,
+        profile_settings: Any = None, use_cache: bool = False) -> Any:
+    """
+    :param problem_number:  The problem number
+    :param solver:          The solver function name, or None for the problem's default
+    :param parameters:      The solver parameters, the problem's defaults filling in any missing ones
+    :param input_path:      The input file, or None for the one shipped with the problem
+    :param profile_settings: The profiling.ProfileSettings to profile the solver call with, or None
+    :param use_cache:       Whether to reuse and store the result in the persistent result store
+    :return: The solver's result
+    """
+    problem = PROBLEMS[problem_number]
+    module, solver, function = resolve_solver(problem_number, solver)
+    # Missing trailing parameters take the problem's defaults
+    parameters = tuple(parameters) + problem.default_parameters[len(parameters):]
+    arguments = problem.solver_arguments(module, solver, parameters, input_path)
+    if use_cache:
+        from memo import default_store
+        solver_function = function
+        # Keyed on the parameters and the input file's content rather than on the parsed input arguments
+        input_paths = [input_path or problem_path(problem_number, problem.input_file)] if problem.input_file else []
+        function = lambda *call_arguments: default_store().call(solver_function, call_arguments, parameters,
+                                                                input_paths)
+    if profile_settings is None:
+        return function(*arguments)
+
+    from profiling import profile_call
+    return profile_call(profile_settings, f"{problem_number}_{solver}", function, *arguments)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_arguments(argv)
+    if args.problem is not None and args.problem not in PROBLEMS:
+        print(f"Unknown problem: {args.problem}", file=sys.stderr)
+        return 2
+    if args.list or args.problem is None:
+        list_solvers(args.problem)
+        return 0
+
+    try:
+        resolve_solver(args.problem, args.solver)
+    except KeyError as error:
+        print(error.args[0], file=sys.stderr)
+        return 2
+
+    profile_settings = None
+    if args.profile or os.environ.get("EULER_PROFILE"):
+        # Only imported when profiling is wanted, so that unprofiled runs pay nothing for it
+        from profiling import settings_from_environment
+        try:
+            profile_settings = settings_from_environment(args.profile, args.profile_dir)
+        except ValueError as error:
+            print(error.args[0], file=sys.stderr)
+            return 2
+
+    parameters: List[Any] = [parse_parameter(parameter) for parameter in args.parameters]
+    start_time = time.time()
+    result = run(args.problem, args.solver, tuple(parameters), args.input, profile_settings, args.cache)
+    end_time = time.time()
+
+    print(f"Result: {result}\nTime: {end_time - start_time}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
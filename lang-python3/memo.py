@@ -0,0 +1,298 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import sys
+import time
+from abc import ABCMeta
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+# A persistent, content-addressed store of solver results shared between runs.  A result's key is the hash of:
+#   - the solver's module and qualified name
+#   - the hash of the source file defining the solver and of every project module it imports, directly or through
+#     other project modules, so that editing the solver or a helper it uses invalidates its results.  Modules imported
+#     inside a function are not seen and are named with cacheable(dependencies=...)
+#   - the solver's arguments in a canonical JSON form
+#   - the content hash of every input file the solver reads, rather than its path
+# Results are pickled into a SQLite database, and the least recently used ones are evicted once the stored results
+# exceed the store's size limit.  A warm call costs one indexed UPDATE ... RETURNING statement.
+CACHE_PATH_VARIABLE: str = "EULER_CACHE_PATH"
+DEFAULT_CACHE_PATH: str = os.path.join(os.path.expanduser("~"), ".cache", "project-euler", "results.sqlite")
+# Modules whose source files are under this directory are project modules
+PROJECT_DIRECTORY: str = os.path.dirname(os.path.abspath(__file__))
+
+
+def canonical_arguments(value: Any) -> Any:
+    """
+    :param value:   A solver argument
+    :return: A JSON serializable form of the argument that only equal arguments share
+    :raises TypeError: if the argument is not built from numbers, strings, and containers of them
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return {"bytes": value.hex()}
+    if isinstance(value, list):
+        return [canonical_arguments(item) for item in value]
+    if isinstance(value, tuple):
+        return {"tuple": [canonical_arguments(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {"set": sorted((canonical_arguments(item) for item in value), key=json.dumps)}
+    if isinstance(value, dict):
+        return {"dict": sorted(([canonical_arguments(key), canonical_arguments(item)] for key, item in value.items()),
+                               key=json.dumps)}
+    raise TypeError(f"Cannot use an argument of type {type(value).__name__} in a result key")
+
+
+_file_digests: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_digest(path: str) -> str:
+    """
+    :param path:    A file path
+    :return: The SHA-256 of the file's content, remembered for as long as the file's size and mtime are unchanged
+    """
+    status = os.stat(path)
+    identity = (os.path.abspath(path), status.st_size, status.st_mtime_ns)
+    if identity not in _file_digests:
+        digest = hashlib.sha256()
+        with open(path, "rb") as source_file:
+            for block in iter(lambda: source_file.read(1 << 20), b""):
+                digest.update(block)
+        _file_digests[identity] = digest.hexdigest()
+    return _file_digests[identity]
+
+
+def project_source_file(module: ModuleType) -> str | None:
+    """
+    :param module:  A module
+    :return: The module's source file if it is a project module, None otherwise
+    """
+    source_file = getattr(module, "__file__", None)
+    if source_file is None or not source_file.endswith(".py"):
+        return None
+    source_file = os.path.abspath(source_file)
+    if not source_file.startswith(PROJECT_DIRECTORY + os.sep) or "site-packages" in source_file:
+        return None
+    return source_file
+
+
+_module_sources: Dict[str, List[str]] = {}
+
+
+def module_sources(module: ModuleType) -> List[str]:
+    """
+    Find the project modules a module imports from its globals: imported modules, and the modules defining the
+    functions and classes imported from them, followed through each project module found.
+
+    :param module:  A module
+    :return: The source files of the module and of the project modules it imports, sorted
+    """
+    if module.__name__ in _module_sources:
+        return _module_sources[module.__name__]
+    sources: Dict[str, ModuleType] = {}
+    pending: List[ModuleType] = [module]
+    while pending:
+        current = pending.pop()
+        source_file = project_source_file(current)
+        if source_file is None or source_file in sources:
+            continue
+        sources[source_file] = current
+        for value in list(vars(current).values()):
+            if isinstance(value, ModuleType):
+                pending.append(value)
+            elif isinstance(getattr(value, "__module__", None), str) and value.__module__ in sys.modules:
+                pending.append(sys.modules[value.__module__])
+    _module_sources[module.__name__] = sorted(sources)
+    return _module_sources[module.__name__]
+
+
+def source_digest(function: Callable, dependencies: Sequence[ModuleType] = ()) -> str:
+    """
+    :param function:        A solver function
+    :param dependencies:    Modules the function imports at call time, beyond those its module imports
+    :return: The SHA-256 of the source files of the function's module, the project modules it imports, and the
+             dependencies, or of the function's bytecode if it has no source file
+    """
+    module = sys.modules.get(function.__module__)
+    if module is None or project_source_file(module) is None:
+        source_file = inspect.getsourcefile(function)
+        if source_file is not None and os.path.exists(source_file):
+            return file_digest(source_file)
+        code = function.__code__
+        return hashlib.sha256(code.co_code + repr(code.co_consts).encode()).hexdigest()
+    source_files = set(module_sources(module))
+    for dependency in dependencies:
+        source_files.update(module_sources(dependency))
+    digest = hashlib.sha256()
+    for source_file in sorted(source_files):
+        digest.update(f"{os.path.relpath(source_file, PROJECT_DIRECTORY)}:{file_digest(source_file)}\n".encode())
+    return digest.hexdigest()
+
+
+def result_key(function: Callable, arguments: Sequence[Any], input_paths: Sequence[str] = (),
+               dependencies: Sequence[ModuleType] = ()) -> str:
+    """
+    :param function:        The solver function
+    :param arguments:       The arguments that determine the result, excluding input file paths
+    :param input_paths:     The input files the result depends upon
+    :param dependencies:    Modules the function imports at call time, beyond those its module imports
+    :return: The key of the function's result for these arguments, input files, and sources
+    """
+    description = json.dumps([
+        f"{function.__module__}.{function.__qualname__}",
+        source_digest(function, dependencies),
+        canonical_arguments(list(arguments)),
+        [file_digest(path) for path in input_paths],
+    ], separators=(",", ":"))
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+class ResultStore(metaclass=ABCMeta):
+    """
+    Solver results in a SQLite database, evicting the least recently used once their total size exceeds max_bytes.
+    """
+    path: str
+    max_bytes: int
+    hits: int
+    misses: int
+    _connection: sqlite3.Connection
+
+    def __init__(self, path: str | None = None, max_bytes: int = 64 << 20):
+        """
+        :param path:        The database file, by default EULER_CACHE_PATH or ~/.cache/project-euler/results.sqlite
+        :param max_bytes:   The total size of the pickled results to keep
+        """
+        self.path = path or os.environ.get(CACHE_PATH_VARIABLE, DEFAULT_CACHE_PATH)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._connection = sqlite3.connect(self.path)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+        """)
+
+    def lookup(self, key: str) -> Tuple[bool, Any]:
+        """
+        :param key: A result key
+        :return: Whether the result is stored, and the result if so
+        """
+        with self._connection:
+            row = self._connection.execute("UPDATE results SET last_used = ? WHERE key = ? RETURNING value",
+                                           (time.time(), key)).fetchone()
+        if row is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, pickle.loads(row[0])
+
+    def store(self, key: str, value: Any) -> None:
+        """
+        Store a result, then evict the least recently used results until the total size fits.  A result larger than
+        the whole store is not kept.
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                                     (key, data, len(data), time.time()))
+            total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total_size <= self.max_bytes:
+                return
+            evicted: List[str] = []
+            for stale_key, size in self._connection.execute("SELECT key, size FROM results ORDER BY last_used"):
+                if total_size <= self.max_bytes:
+                    break
+                evicted.append(stale_key)
+                total_size -= size
+            self._connection.executemany("DELETE FROM results WHERE key = ?", [(stale_key,) for stale_key in evicted])
+
+    def call(self, function: Callable, arguments: Sequence[Any], key_arguments: Sequence[Any] | None = None,
+             input_paths: Sequence[str] = (), dependencies: Sequence[ModuleType] = ()) -> Any:
+        """
+        :param function:        The solver function
+        :param arguments:       The arguments to call it with on a miss
+        :param key_arguments:   The arguments to key the result on, if not the call arguments themselves
+        :param input_paths:     The input files the result depends upon
+        :param dependencies:    Modules the function imports at call time, beyond those its module imports
+        :return: The stored result, or the function's result after storing it
+        """
+        key = result_key(function, arguments if key_arguments is None else key_arguments, input_paths, dependencies)
+        found, value = self.lookup(key)
+        if found:
+            return value
+        value = function(*arguments)
+        self.store(key, value)
+        return value
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._connection:
+            self._connection.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+_default_store: ResultStore | None = None
+
+
+def default_store() -> ResultStore:
+    global _default_store
+    if _default_store is None:
+        _default_store = ResultStore()
+    return _default_store
+
+
+def cacheable(path_arguments: Tuple[int, ...] = (), store: ResultStore | None = None,
+              dependencies: Sequence[ModuleType] = ()) -> Callable[[Callable], Callable]:
+    """
+    Make a solver's results persistent across runs:
+
+        @cacheable()
+        def get_nth_prime_sieve_of_eratosthenes(prime_idx: int) -> int: ...
+
+        @cacheable(path_arguments=(0,))
+        def solve_all(path: str = GRID_FILE) -> int: ...
+
+    or wrap an existing one with cacheable()(get_combinations_with_tuples).  Keyword arguments are not supported.
+
+    :param path_arguments:  The positions of arguments that are input file paths, keyed by the file content
+    :param store:           The store to use, by default the one at EULER_CACHE_PATH
+    :param dependencies:    Project modules the solver imports at call time, whose sources are keyed along with those
+                            its module imports
+    :return: The decorator
+    """
+    def decorate(function: Callable) -> Callable:
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def cached(*arguments: Any) -> Any:
+            # Apply the defaults so that f() and f(default) share a key
+            bound_arguments = signature.bind(*arguments)
+            bound_arguments.apply_defaults()
+            arguments = bound_arguments.args
+            input_paths = [arguments[index] for index in path_arguments]
+            key_arguments = [argument for index, argument in enumerate(arguments) if index not in path_arguments]
+            result_store = store if store is not None else default_store()
+            return result_store.call(function, arguments, key_arguments, input_paths, dependencies)
+
+        return cached
+
+    return decorate
@@ -0,0 +1,430 @@
+import bisect
+import math
+import random
+from abc import ABCMeta
+from array import array
+from itertools import compress, islice
+from typing import Dict, Generator, Iterator, List, Sequence, Tuple
+
+
+# Shared number theory for the problem modules: prime generation, a smallest-prime-factor sieve for factorizing many
+# small numbers, Miller-Rabin and Pollard-rho for the occasional large one, batch divisor and totient tables, and the
+# least common multiples of subsets for inclusion-exclusion.
+
+# Witnesses that make Miller-Rabin deterministic for every n below 3.3 * 10^24
+_MILLER_RABIN_BASES: List[int] = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+_SMALL_PRIMES: List[int] = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47]
+
+
+def segmented_eratosthanes_prime_generator(segment_size: int = 100000) -> Generator[int, None, None]:
+    primes: List[int] = []
+    generator_index: int = 0
+    offset: int = 2
+
+    # Generate the first segment normally
+    prime_test = [True for _ in range(segment_size)]
+    i = 2
+    while i - offset < segment_size:
+        if prime_test[i - offset]:
+            j = i*i
+            while j - offset < segment_size:
+                prime_test[j - offset] = False
+                j += i
+        i += 1
+    for idx, is_prime in enumerate(prime_test):
+        if is_prime:
+            primes.append(idx + offset)
+    del prime_test
+    offset += segment_size
+
+    while True:
+        while generator_index == len(primes):
+            primes = primes + primes_in_next_eratosthanes_segment(primes, offset, segment_size)
+            offset += segment_size
+
+        yield primes[generator_index]
+        generator_index += 1
+
+
+def primes_in_next_eratosthanes_segment(primes, offset, segment_size) -> List[int]:
+    return list(compress(range(offset, offset + segment_size), _sieve_window(primes, offset, segment_size)))
+
+
+def _sieve_window(base_primes, offset: int, size: int) -> bytearray:
+    """
+    :param base_primes: The primes in increasing order, at least up to the square root of offset + size - 1
+    :param offset:      The first number of the window
+    :param size:        The number of numbers in the window
+    :return: A flag for each number of the window, set if it is prime
+    """
+    window = bytearray([1]) * size
+    if offset < 2:
+        window[0:2 - offset] = bytes(min(size, 2 - offset))
+    end = offset + size
+    root = math.isqrt(end - 1)
+    for prime in base_primes:
+        if prime > root:
+            break
+        start = max(prime * prime, offset + -offset % prime)
+        if start < end:
+            window[start - offset::prime] = bytes(len(range(start - offset, size, prime)))
+    return window
+
+
+def primes_up_to(limit: int) -> array:
+    """
+    :param limit:   The largest number to sieve
+    :return: The primes up to the limit, in increasing order
+    """
+    is_prime = bytearray([1]) * (limit + 1)
+    is_prime[0:2] = bytes(min(2, limit + 1))
+    for number in range(2, math.isqrt(limit) + 1):
+        if is_prime[number]:
+            is_prime[number * number::number] = bytes(len(range(number * number, limit + 1, number)))
+    return array("I", compress(range(0, limit + 1), is_prime))
+
+
+def primes_in_range(low: int, high: int, count_only: bool = False, segment_size: int = 1 << 18) -> array | int:
+    """
+    Sieve only the numbers from low to high, in segments, with the base primes up to the square root of high.  The cost
+    is proportional to the width of the range plus the square root of high, however far from zero the range is.  Each
+    segment is widened to at least the square root of high so that every base prime crosses out something in most
+    segments rather than being tried once per segment for nothing.
+
+    :param low:             The first number of the range
+    :param high:            The last number of the range
+    :param count_only:      Return the number of primes instead of the primes
+    :param segment_size:    The number of numbers sieved at once, sized to stay in cache
+    :return: The primes from low to high inclusive in increasing order, or their number
+    """
+    low = max(low, 0)
+    if high < low:
+        return 0 if count_only else array("Q")
+    base_primes = primes_up_to(math.isqrt(high))
+    segment_size = max(segment_size, math.isqrt(high))
+    primes = array("Q")
+    count = 0
+    for offset in range(low, high + 1, segment_size):
+        size = min(segment_size, high + 1 - offset)
+        window = _sieve_window(base_primes, offset, size)
+        if count_only:
+            count += window.count(1)
+        else:
+            primes.extend(compress(range(offset, offset + size), window))
+    return count if count_only else primes
+
+
+# The incremental generator skips the multiples of 2, 3, 5, and 7: the 48 residues modulo 210 coprime to them, from 11,
+# and the gaps from each to the next
+WHEEL_PRIMES: Tuple[int, ...] = (2, 3, 5, 7)
+_WHEEL_MODULUS: int = 210
+_WHEEL_RESIDUES: Tuple[int, ...] = tuple(number for number in range(11, 11 + _WHEEL_MODULUS)
+                                         if all(number % prime for prime in WHEEL_PRIMES))
+_WHEEL_GAPS: Tuple[int, ...] = tuple((_WHEEL_RESIDUES[(index + 1) % len(_WHEEL_RESIDUES)] - residue) % _WHEEL_MODULUS
+                                     for index, residue in enumerate(_WHEEL_RESIDUES))
+_WHEEL_POSITIONS: Dict[int, int] = {residue % _WHEEL_MODULUS: index for index, residue in enumerate(_WHEEL_RESIDUES)}
+
+
+def incremental_prime_generator() -> Generator[int, None, None]:
+    """
+    An endless stream of primes needing no limit or segment size.  Memory stays proportional to the number of primes
+    up to the square root of the last prime yielded, so a consumer may pull primes indefinitely.
+    """
+    yield from WHEEL_PRIMES
+    yield from _wheel_sieve()
+
+
+def _wheel_sieve() -> Generator[int, None, None]:
+    """
+    O'Neill's incremental sieve with postponed insertion.  Each composite still to come that is a multiple of a prime
+    already past its square maps to that prime and the wheel position of its cofactor.  A prime is only entered once
+    its square is reached, so the table holds the primes up to the square root of the current candidate.  Those primes
+    come from a second, lazily advanced instance of this generator, which in turn only reaches the fourth root.
+
+    :return: The primes from 11 on
+    """
+    gaps = _WHEEL_GAPS
+    wheel_size = len(gaps)
+    yield 11
+    # The prime whose multiples are crossed out from the number each maps to on, with the wheel position of the cofactor
+    composites: Dict[int, Tuple[int, int]] = {}
+    base_primes = _wheel_sieve()
+    base_prime = next(base_primes)
+    base_square = base_prime * base_prime
+    candidate, position = 13, 1
+    while True:
+        step = composites.pop(candidate, None)
+        if step is None and candidate < base_square:
+            yield candidate
+        else:
+            if step is None:
+                # The square of the next base prime: its multiples start here, at the cofactor base_prime
+                step = (base_prime, _WHEEL_POSITIONS[base_prime % _WHEEL_MODULUS])
+                base_prime = next(base_primes)
+                base_square = base_prime * base_prime
+            prime, multiple_position = step
+            multiple = candidate
+            while True:
+                multiple += prime * gaps[multiple_position]
+                multiple_position = (multiple_position + 1) % wheel_size
+                if multiple not in composites:
+                    break
+            composites[multiple] = (prime, multiple_position)
+        candidate += gaps[position]
+        position = (position + 1) % wheel_size
+
+
+def prime_batches(batch_size: int = 65536, primes: Iterator[int] | None = None) -> Generator[array, None, None]:
+    """
+    :param batch_size:  The number of primes in each batch
+    :param primes:      [optional] The stream to take the batches from, a new incremental_prime_generator() if not given
+    :return: Consecutive batches of primes as compact arrays, the last one shorter if the stream ends
+    """
+    primes = primes if primes is not None else incremental_prime_generator()
+    while True:
+        batch = array("Q", islice(primes, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def nth_prime_upper_bound(prime_idx: int) -> int:
+    """
+    :param prime_idx:   A 1-based prime index
+    :return: A number no smaller than the prime_idx-th prime (Rosser's bound n(ln n + ln ln n) for n >= 6)
+    """
+    if prime_idx < 6:
+        return 13
+    log_n = math.log(prime_idx)
+    return int(prime_idx * (log_n + math.log(log_n))) + 1
+
+
+class PrimeSieve(metaclass=ABCMeta):
+    """
+    The smallest prime factor of every number up to a limit, kept in a compact array so that any number up to the limit
+    is factorized in O(log n) by repeated division.
+    """
+    limit: int
+    smallest_factors: array
+    primes: array
+
+    def __init__(self, limit: int):
+        """
+        Rather than a linear sieve, which crosses out each composite once but does so from Python, every prime up to
+        the square root overwrites the factors of its multiples with one slice assignment.  The primes go in decreasing
+        order so that each number is left holding its smallest prime factor.
+
+        :param limit:   The largest number to sieve
+        """
+        self.limit = limit
+        root = math.isqrt(limit)
+        self.primes = primes_up_to(limit)
+
+        self.smallest_factors = array("I", range(0, limit + 1))
+        for prime in reversed(self.primes[:bisect.bisect_right(self.primes, root)]):
+            start = prime * prime
+            self.smallest_factors[start::prime] = array("I", [prime]) * len(range(start, limit + 1, prime))
+
+    def is_prime(self, number: int) -> bool:
+        return number >= 2 and self.smallest_factors[number] == number
+
+    def factorize(self, number: int) -> Dict[int, int]:
+        """
+        :param number:  A number from 1 up to the sieve limit
+        :return: The number's prime factors mapped to their exponents, in increasing order
+        """
+        factors: Dict[int, int] = {}
+        smallest_factors = self.smallest_factors
+        while number > 1:
+            prime = smallest_factors[number]
+            number //= prime
+            factors[prime] = factors.get(prime, 0) + 1
+        return factors
+
+    def totients(self) -> array:
+        """
+        :return: Euler's totient of every number up to the limit (index 0 holds 0)
+        """
+        smallest_factors = self.smallest_factors
+        totients = array("I", [0]) * (self.limit + 1)
+        if self.limit >= 1:
+            totients[1] = 1
+        for number in range(2, self.limit + 1):
+            prime = smallest_factors[number]
+            cofactor = number // prime
+            totients[number] = totients[cofactor] * (prime if cofactor % prime == 0 else prime - 1)
+        return totients
+
+    def divisor_counts(self) -> array:
+        """
+        :return: The number of divisors of every number up to the limit (index 0 holds 0)
+        """
+        smallest_factors = self.smallest_factors
+        counts = array("I", [0]) * (self.limit + 1)
+        # The exponent of each number's smallest prime factor
+        exponents = array("B", [0]) * (self.limit + 1)
+        if self.limit >= 1:
+            counts[1] = 1
+        for number in range(2, self.limit + 1):
+            prime = smallest_factors[number]
+            cofactor = number // prime
+            if smallest_factors[cofactor] == prime:
+                exponent = exponents[cofactor] + 1
+                counts[number] = counts[cofactor] // exponent * (exponent + 1)
+            else:
+                exponent = 1
+                counts[number] = counts[cofactor] * 2
+            exponents[number] = exponent
+        return counts
+
+    def divisor_sums(self) -> array:
+        """
+        :return: The sum of the divisors of every number up to the limit (index 0 holds 0)
+        """
+        smallest_factors = self.smallest_factors
+        sums = array("Q", [0]) * (self.limit + 1)
+        # 1 + p + ... + p^e for each number's smallest prime factor p with exponent e
+        power_sums = array("Q", [0]) * (self.limit + 1)
+        if self.limit >= 1:
+            sums[1] = 1
+        for number in range(2, self.limit + 1):
+            prime = smallest_factors[number]
+            cofactor = number // prime
+            if smallest_factors[cofactor] == prime:
+                power_sums[number] = power_sums[cofactor] * prime + 1
+                sums[number] = sums[cofactor] // power_sums[cofactor] * power_sums[number]
+            else:
+                power_sums[number] = prime + 1
+                sums[number] = sums[cofactor] * (prime + 1)
+        return sums
+
+
+def is_probable_prime(number: int) -> bool:
+    """
+    Miller-Rabin test, deterministic below 3.3 * 10^24 and with negligible error above.
+    """
+    if number < 2:
+        return False
+    for prime in _SMALL_PRIMES:
+        if number % prime == 0:
+            return number == prime
+
+    odd_part = number - 1
+    twos = 0
+    while odd_part % 2 == 0:
+        odd_part //= 2
+        twos += 1
+    for base in _MILLER_RABIN_BASES:
+        value = pow(base, odd_part, number)
+        if value == 1 or value == number - 1:
+            continue
+        for _square in range(1, twos):
+            value = value * value % number
+            if value == number - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def pollard_rho(number: int, rng: random.Random | None = None) -> int:
+    """
+    Brent's variant of Pollard's rho, batching the gcd over runs of steps.
+
+    :param number:  An odd composite number
+    :param rng:     The random number generator choosing the polynomial
+    :return: A non-trivial factor of the number
+    """
+    rng = rng or random.Random(number)
+    while True:
+        constant = rng.randrange(1, number)
+        fast = rng.randrange(0, number)
+        batch_size = 128
+        divisor = product = run_length = 1
+        while divisor == 1:
+            slow = fast
+            for _step in range(0, run_length):
+                fast = (fast * fast + constant) % number
+            steps = 0
+            while steps < run_length and divisor == 1:
+                saved = fast
+                for _step in range(0, min(batch_size, run_length - steps)):
+                    fast = (fast * fast + constant) % number
+                    product = product * abs(slow - fast) % number
+                divisor = math.gcd(product, number)
+                steps += batch_size
+            run_length *= 2
+        if divisor == number:
+            # The batch overshot: step through it one at a time
+            divisor = 1
+            while divisor == 1:
+                saved = (saved * saved + constant) % number
+                divisor = math.gcd(abs(slow - saved), number)
+        if divisor != number:
+            return divisor
+
+
+def factorize(number: int, sieve: PrimeSieve | None = None) -> Dict[int, int]:
+    """
+    :param number:  A positive number
+    :param sieve:   A sieve to factorize the number, and any of its factors, with when they are within its limit
+    :return: The number's prime factors mapped to their exponents, in increasing order
+    """
+    if number < 1:
+        raise ValueError(f"Cannot factorize {number}")
+    factors: Dict[int, int] = {}
+    pending: List[int] = [number]
+    while pending:
+        value = pending.pop()
+        if value == 1:
+            continue
+        if sieve is not None and value <= sieve.limit:
+            for prime, exponent in sieve.factorize(value).items():
+                factors[prime] = factors.get(prime, 0) + exponent
+            continue
+        for prime in _SMALL_PRIMES:
+            while value % prime == 0:
+                value //= prime
+                factors[prime] = factors.get(prime, 0) + 1
+        if value == 1:
+            continue
+        if is_probable_prime(value):
+            factors[value] = factors.get(value, 0) + 1
+            continue
+        divisor = pollard_rho(value)
+        pending.extend([divisor, value // divisor])
+    return dict(sorted(factors.items()))
+
+
+def divisor_count(factors: Dict[int, int]) -> int:
+    return math.prod(exponent + 1 for exponent in factors.values())
+
+
+def divisor_sum(factors: Dict[int, int]) -> int:
+    return math.prod((prime ** (exponent + 1) - 1) // (prime - 1) for prime, exponent in factors.items())
+
+
+def totient(factors: Dict[int, int]) -> int:
+    return math.prod((prime - 1) * prime ** (exponent - 1) for prime, exponent in factors.items())
+
+
+def subset_lcms(bases: Sequence[int], limit: int | None = None) -> List[Tuple[int, int]]:
+    """
+    The least common multiples of every non-empty subset of the bases, each built from a subset one base smaller with
+    a single gcd.  Once a subset's multiple exceeds the limit so do those of all its supersets, and they are skipped.
+
+    :param bases:   Positive integers
+    :param limit:   [optional] The largest multiple to report
+    :return: The multiple and size of each subset whose multiple is within the limit
+    """
+    multiples: List[Tuple[int, int]] = []
+    pending: List[Tuple[int, int, int]] = [(1, 0, 0)]  # multiple, size, index of the next base to add
+    while pending:
+        multiple, size, next_index = pending.pop()
+        for index in range(next_index, len(bases)):
+            extended = multiple // math.gcd(multiple, bases[index]) * bases[index]
+            if limit is not None and extended > limit:
+                continue
+            multiples.append((extended, size + 1))
+            pending.append((extended, size + 1, index + 1))
+    return multiples
@@ -0,0 +1,297 @@
+import itertools
+import time
+from abc import ABCMeta
+from collections import OrderedDict
+from fractions import Fraction
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from problem_54 import HandType
+
+
+# Exact Texas hold'em equity: every way of completing the board is dealt out and each player's best five of seven
+# cards evaluated, so the result carries no sampling error.
+#
+# Cards are integers 4 * rank + suit, with ranks 0..12 for 2..Ace, so that dealing and evaluating allocate no Card or
+# Hand objects.  A hand's strength is a single integer: its HandType value followed by up to five card values (2..14,
+# as in problem_54) of four bits each, most significant first, so that stronger hands have larger keys.  Unlike the
+# Project Euler rules, the ace also plays low in the A-2-3-4-5 straight.
+#
+# Relabelling the suits changes no player's equity, so situations are cached under the smallest relabelling of their
+# hole cards and board.
+
+RANK_CHARACTERS: str = "23456789TJQKA"
+SUIT_CHARACTERS: str = "HDCS"
+DECK: Tuple[int, ...] = tuple(range(0, 52))
+SUIT_PERMUTATIONS: Tuple[Tuple[int, ...], ...] = tuple(itertools.permutations(range(0, 4)))
+
+_WHEEL_MASK: int = 0b1000000001111
+
+
+def _straight_high_ranks() -> List[int]:
+    """
+    :return: For every 13-bit set of ranks, the highest rank ending a straight within it, or -1
+    """
+    high_ranks = [-1] * (1 << 13)
+    for mask in range(0, 1 << 13):
+        for high_rank in range(12, 3, -1):
+            straight = 0b11111 << (high_rank - 4)
+            if mask & straight == straight:
+                high_ranks[mask] = high_rank
+                break
+        else:
+            if mask & _WHEEL_MASK == _WHEEL_MASK:
+                high_ranks[mask] = 3
+    return high_ranks
+
+
+_STRAIGHT_HIGH_RANKS: List[int] = _straight_high_ranks()
+# Memo of the strength of every non-flush rank multiset seen so far, keyed by its sorted ranks
+_RANK_KEYS: Dict[Tuple[int, ...], int] = {}
+
+
+def card_from_string(serialized_card: str) -> int:
+    """
+    :param serialized_card: A card in the 0054_poker.txt notation, such as "TH" or "AS"
+    :return: The card's integer code
+    """
+    if len(serialized_card) != 2 or serialized_card[0] not in RANK_CHARACTERS or \
+            serialized_card[1] not in SUIT_CHARACTERS:
+        raise ValueError(f"Unable to parse card: {serialized_card}")
+    return 4 * RANK_CHARACTERS.index(serialized_card[0]) + SUIT_CHARACTERS.index(serialized_card[1])
+
+
+def cards_from_string(serialized_cards: str) -> List[int]:
+    return [card_from_string(serialized_card) for serialized_card in serialized_cards.split()]
+
+
+def _pack(hand_type: HandType, ranks: Iterable[int]) -> int:
+    key = hand_type.value
+    count = 0
+    for rank in ranks:
+        key = (key << 4) | (rank + 2)
+        count += 1
+    return key << (4 * (5 - count))
+
+
+def _rank_key(sorted_ranks: Tuple[int, ...]) -> int:
+    """
+    :param sorted_ranks:    The ranks of seven cards holding no flush, in descending order
+    :return: The strength of the best five cards
+    """
+    counts: Dict[int, int] = {}
+    rank_mask = 0
+    for rank in sorted_ranks:
+        counts[rank] = counts.get(rank, 0) + 1
+        rank_mask |= 1 << rank
+    # Ranks ordered by how often they appear, then by rank
+    grouped = sorted(counts, key=lambda rank: (counts[rank], rank), reverse=True)
+    top_count = counts[grouped[0]]
+
+    if top_count == 4:
+        return _pack(HandType.FourOfAKind, [grouped[0], max(rank for rank in grouped[1:])])
+    if top_count == 3 and counts[grouped[1]] >= 2:
+        return _pack(HandType.FullHouse, grouped[0:2])
+    straight_high = _STRAIGHT_HIGH_RANKS[rank_mask]
+    if straight_high >= 0:
+        return _pack(HandType.Straight, [straight_high])
+    if top_count == 3:
+        return _pack(HandType.ThreeOfAKind, [grouped[0]] + sorted(grouped[1:], reverse=True)[0:2])
+    if top_count == 2 and counts[grouped[1]] == 2:
+        kicker = max(rank for rank in grouped[2:])
+        return _pack(HandType.TwoPairs, [grouped[0], grouped[1], kicker])
+    if top_count == 2:
+        return _pack(HandType.OnePair, [grouped[0]] + grouped[1:4])
+    return _pack(HandType.HighCard, grouped[0:5])
+
+
+def evaluate(cards: Sequence[int]) -> int:
+    """
+    :param cards:   Five to seven card codes
+    :return: The strength of the best five of the cards; stronger hands have larger values
+    """
+    suit_masks = [0, 0, 0, 0]
+    for card in cards:
+        suit_masks[card & 3] |= 1 << (card >> 2)
+    for suit_mask in suit_masks:
+        if suit_mask.bit_count() >= 5:
+            # With at most seven cards a flush rules out four of a kind and a full house
+            straight_high = _STRAIGHT_HIGH_RANKS[suit_mask]
+            if straight_high >= 0:
+                return _pack(HandType.StraightFlush, [straight_high])
+            return _pack(HandType.Flush, [rank for rank in range(12, -1, -1) if suit_mask >> rank & 1][0:5])
+
+    sorted_ranks = tuple(sorted((card >> 2 for card in cards), reverse=True))
+    key = _RANK_KEYS.get(sorted_ranks)
+    if key is None:
+        key = _RANK_KEYS[sorted_ranks] = _rank_key(sorted_ranks)
+    return key
+
+
+def hand_type_of(key: int) -> HandType:
+    return HandType(key >> 20)
+
+
+class EquityResult(metaclass=ABCMeta):
+    """
+    The outcome of every completion of the board.  A board won outright counts as a win; a board shared by k players
+    gives each of them a 1/k share.
+    """
+    boards: int
+    wins: List[int]
+    split_shares: List[Fraction]
+
+    def __init__(self, boards: int, wins: List[int], split_shares: List[Fraction]):
+        super().__init__()
+        self.boards = boards
+        self.wins = wins
+        self.split_shares = split_shares
+
+    def equity(self, player: int) -> Fraction:
+        """
+        :return: The player's exact share of the pot over all boards
+        """
+        return (self.wins[player] + self.split_shares[player]) / self.boards
+
+    def equities(self) -> List[Fraction]:
+        return [self.equity(player) for player in range(0, len(self.wins))]
+
+    def __repr__(self) -> str:
+        return f"EquityResult(boards={self.boards}, equities={[float(equity) for equity in self.equities()]})"
+
+
+class EquityCache(metaclass=ABCMeta):
+    """
+    Least-recently-used cache of equity results keyed by canonical situation.
+    """
+    capacity: int
+    hits: int
+    misses: int
+    _results: "OrderedDict[Tuple, EquityResult]"
+
+    def __init__(self, capacity: int = 4096):
+        super().__init__()
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def get(self, key: Tuple) -> EquityResult | None:
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: Tuple, result: EquityResult) -> None:
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.capacity:
+            self._results.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+def canonical_situation(holes: Sequence[Sequence[int]], board: Sequence[int]) -> Tuple:
+    """
+    :param holes:   Each player's hole cards, in player order
+    :param board:   The board cards dealt so far
+    :return: The smallest form of the situation over the 24 suit relabellings, with each player's hole cards and the
+             board sorted since their order does not matter.  Player order is kept, as equities are per player.
+    """
+    best: Tuple | None = None
+    for permutation in SUIT_PERMUTATIONS:
+        relabelled = (tuple(tuple(sorted(card & ~3 | permutation[card & 3] for card in hole)) for hole in holes),
+                      tuple(sorted(card & ~3 | permutation[card & 3] for card in board)))
+        if best is None or relabelled < best:
+            best = relabelled
+    return best
+
+
+def enumerate_equity(holes: Sequence[Sequence[int]], board: Sequence[int] = ()) -> EquityResult:
+    """
+    :param holes:   Each player's two hole cards
+    :param board:   The zero to five board cards dealt so far
+    :return: The result of every completion of the board from the remaining deck
+    """
+    dealt = [card for hole in holes for card in hole] + list(board)
+    if len(set(dealt)) != len(dealt):
+        raise ValueError("A card is dealt more than once")
+    if len(board) > 5:
+        raise ValueError(f"A board holds at most five cards, not {len(board)}")
+    dealt_set = set(dealt)
+    remaining = [card for card in DECK if card not in dealt_set]
+
+    players = len(holes)
+    boards = 0
+    wins = [0] * players
+    split_shares = [Fraction(0)] * players
+    base_board = list(board)
+    hole_cards = [list(hole) for hole in holes]
+    hole_ranks = [[card >> 2 for card in hole] for hole in holes]
+    rank_keys = _RANK_KEYS
+    for completion in itertools.combinations(remaining, 5 - len(board)):
+        full_board = base_board + list(completion)
+        # Most boards hold no three cards of a suit, which rules out a flush for every player at once
+        suit_counts = [0, 0, 0, 0]
+        for card in full_board:
+            suit_counts[card & 3] += 1
+        if max(suit_counts) >= 3:
+            keys = [evaluate(full_board + hole) for hole in hole_cards]
+        else:
+            board_ranks = [card >> 2 for card in full_board]
+            keys = []
+            for ranks in hole_ranks:
+                sorted_ranks = tuple(sorted(board_ranks + ranks, reverse=True))
+                key = rank_keys.get(sorted_ranks)
+                if key is None:
+                    key = rank_keys[sorted_ranks] = _rank_key(sorted_ranks)
+                keys.append(key)
+        best = max(keys)
+        winners = [player for player, key in enumerate(keys) if key == best]
+        if len(winners) == 1:
+            wins[winners[0]] += 1
+        else:
+            for player in winners:
+                split_shares[player] += Fraction(1, len(winners))
+        boards += 1
+    return EquityResult(boards, wins, split_shares)
+
+
+def exact_equity(holes: Sequence[Sequence[int] | str], board: Sequence[int] | str = (),
+                 cache: EquityCache | None = None) -> EquityResult:
+    """
+    :param holes:   Each player's hole cards, as card codes or a string such as "AS KS"
+    :param board:   The board cards dealt so far, as card codes or a string
+    :param cache:   [optional] A cache of results shared between suit-isomorphic situations
+    :return: The exact equity of each player
+    """
+    hole_cards = [cards_from_string(hole) if isinstance(hole, str) else list(hole) for hole in holes]
+    board_cards = cards_from_string(board) if isinstance(board, str) else list(board)
+    if cache is None:
+        return enumerate_equity(hole_cards, board_cards)
+
+    key = canonical_situation(hole_cards, board_cards)
+    result = cache.get(key)
+    if result is None:
+        result = enumerate_equity(hole_cards, board_cards)
+        cache.put(key, result)
+    return result
+
+
+if __name__ == "__main__":
+    equity_cache = EquityCache()
+    situations = [
+        (["AS KS", "QH QD"], "2S 7S 9D"),
+        (["AH KH", "QC QS"], "2H 7H 9C"),  # Suit-isomorphic to the first
+        (["AS AD", "7C 8C", "KH KD"], "6C 9C 2H 3S"),
+    ]
+
+    start_time = time.time()
+    for situation_holes, situation_board in situations:
+        print(f"{situation_holes} on {situation_board}: {exact_equity(situation_holes, situation_board, equity_cache)}")
+    end_time = time.time()
+
+    print(f"Hits: {equity_cache.hits}\nMisses: {equity_cache.misses}\nTime: {end_time - start_time}")
@@ -0,0 +1,368 @@
+import argparse
+import asyncio
+import json
+import time
+from abc import ABCMeta
+from collections import deque
+from typing import Deque, Dict, List, Sequence, Tuple
+
+from problem_54 import POKER_FILE, Card, to_card, to_hand
+
+
+# A hand evaluation server, so that services share one warm evaluator instead of each importing problem_54.
+#
+# Clients send newline-delimited deals in the 0054_poker.txt format, ten cards with player 1's five first, and get one
+# line back per deal, in order: "1" or "2" for the winning player, "0" for a tie, or "E <reason>" for a malformed
+# deal or a batch the evaluator failed on.  The line "STATS" is answered, in its turn, with the server's counters as
+# JSON.
+#
+# Deals from every connection go through one queue.  The batcher takes the first waiting deal, waits batch_window
+# seconds (or until max_batch deals) for more to arrive, and evaluates the whole batch in one call, so that a burst of
+# small requests costs one wake-up instead of one per deal.
+#
+# The evaluator is pure Python, so a batch is not vectorized in the SIMD sense.  Instead it is parsed in one pass into
+# integer card codes through a table of the 52 cards, rather than a regex and a Card per card, and each hand's sort key
+# is looked up by its pattern of values and whether it is a flush, which is all that decides a hand's strength.
+# problem_54's to_hand only runs the first time a pattern is seen, and there are fewer than 7500 patterns.  The keys of
+# the whole batch are then compared together.
+STATS_COMMAND: str = "STATS"
+SUITS: Tuple[str, ...] = ("Heart", "Diamond", "Club", "Spade")
+# Each card in the 0054_poker.txt notation mapped to its code, value * 4 + suit
+CARD_CODES: Dict[str, int] = {f"{rank}{suit}": value * 4 + suit_index
+                              for value, rank in enumerate("23456789TJQKA", 2)
+                              for suit_index, suit in enumerate("HDCS")}
+# The sort key of every hand pattern seen so far: whether the hand is a flush, and its values in increasing order
+_PATTERN_KEYS: Dict[Tuple[bool, Tuple[int, ...]], Tuple[int, ...]] = {}
+
+
+def card_code(serialized_card: str) -> int:
+    """
+    :param serialized_card: A card in the 0054_poker.txt notation
+    :return: The card's code, value * 4 + suit
+    :raises AssertionError: if the card cannot be parsed, as problem_54's to_card does
+    """
+    code = CARD_CODES.get(serialized_card)
+    if code is None:
+        card = to_card(serialized_card)
+        code = card.value * 4 + SUITS.index(card.suit)
+    return code
+
+
+def hand_key(codes: Sequence[int]) -> Tuple[int, ...]:
+    """
+    :param codes:   The codes of a hand's five cards
+    :return: The hand's sort key, as problem_54's Hand.sort_key() gives it
+    """
+    pattern = (len({code & 3 for code in codes}) == 1, tuple(sorted([code >> 2 for code in codes])))
+    key = _PATTERN_KEYS.get(pattern)
+    if key is None:
+        key = to_hand([Card(code >> 2, SUITS[code & 3]) for code in codes]).sort_key()
+        _PATTERN_KEYS[pattern] = key
+    return key
+
+
+def evaluate_deals(deals: Sequence[str]) -> List[str]:
+    """
+    :param deals:   Lines of ten serialized cards, player 1's five cards first
+    :return: The outcome of each deal: "1" or "2" for the winner, "0" for a tie, or "E <reason>"
+    """
+    outcomes: List[str] = [""] * len(deals)
+    # The card codes of every well-formed deal, ten per deal, and the index of each of those deals
+    codes: List[int] = []
+    parsed: List[int] = []
+    for index, deal in enumerate(deals):
+        serialized_cards = deal.split()
+        if len(serialized_cards) != 10:
+            outcomes[index] = f"E expected 10 cards, got {len(serialized_cards)}"
+            continue
+        deal_codes = list(map(CARD_CODES.get, serialized_cards))
+        if None in deal_codes:
+            try:
+                deal_codes = list(map(card_code, serialized_cards))
+            except (AssertionError, ValueError) as error:
+                outcomes[index] = f"E {error}"
+                continue
+        codes.extend(deal_codes)
+        parsed.append(index)
+
+    hands = iter(codes)
+    keys = list(map(hand_key, zip(hands, hands, hands, hands, hands)))
+    for index, player_1, player_2 in zip(parsed, keys[0::2], keys[1::2]):
+        outcomes[index] = "1" if player_1 > player_2 else "2" if player_2 > player_1 else "0"
+    return outcomes
+
+
+class ServerStats(metaclass=ABCMeta):
+    """
+    Counters of a running server.  Latencies are kept for the most recent deals only.
+    """
+    deals: int
+    batches: int
+    failed_batches: int
+    queue_depth: int
+    max_queue_depth: int
+    latencies: Deque[float]
+
+    def __init__(self, latency_window: int = 10000):
+        super().__init__()
+        self.deals = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.latencies = deque(maxlen=latency_window)
+
+    def to_record(self) -> Dict[str, float | int]:
+        latencies = sorted(self.latencies)
+
+        def percentile(percent: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(percent / 100 * len(latencies)))] * 1000
+
+        return {
+            "deals": self.deals,
+            "batches": self.batches,
+            "mean_batch_size": self.deals / self.batches if self.batches else 0.0,
+            "failed_batches": self.failed_batches,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "latency_p50_ms": percentile(50),
+            "latency_p99_ms": percentile(99),
+            "latency_max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        }
+
+
+class PokerServer(metaclass=ABCMeta):
+    batch_window: float
+    max_batch: int
+    stats: ServerStats
+    _queue: "asyncio.Queue[Tuple[str, float, asyncio.Future]]"
+    _batcher: "asyncio.Task | None"
+
+    def __init__(self, batch_window: float = 0.002, max_batch: int = 1024):
+        """
+        :param batch_window:    How long the batcher waits for more deals after the first, in seconds
+        :param max_batch:       The most deals evaluated in one batch
+        """
+        super().__init__()
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.stats = ServerStats()
+        self._queue = asyncio.Queue()
+        self._batcher = None
+
+    def start(self) -> None:
+        if self._batcher is None:
+            self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+
+    async def stop(self) -> None:
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+
+    def submit(self, deal: str) -> "asyncio.Future[str]":
+        """
+        :param deal:    A line of ten serialized cards
+        :return: A future of the deal's outcome
+        """
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((deal, time.perf_counter(), future))
+        self.stats.queue_depth = self._queue.qsize()
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.stats.queue_depth)
+        return future
+
+    async def _run_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+            self.stats.queue_depth = self._queue.qsize()
+
+            try:
+                outcomes = evaluate_deals([deal for deal, _submitted, _future in batch])
+            except Exception as error:
+                # Fail this batch's requests rather than the batcher, which every later request depends on
+                for _deal, _submitted, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                self.stats.failed_batches += 1
+                continue
+            finished = time.perf_counter()
+            for (_deal, submitted, future), outcome in zip(batch, outcomes):
+                if not future.done():
+                    future.set_result(outcome)
+                self.stats.latencies.append(finished - submitted)
+            self.stats.deals += len(batch)
+            self.stats.batches += 1
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Read deals until the client closes its side, writing each outcome as soon as it and every earlier outcome of
+        the connection are known.
+        """
+        # Futures of outcomes, STATS_COMMAND for a stats request, and None once the client is done
+        pending: asyncio.Queue[asyncio.Future | str | None] = asyncio.Queue()
+
+        async def write_outcomes() -> None:
+            while True:
+                item = await pending.get()
+                if item is None:
+                    break
+                if isinstance(item, str):
+                    # Taken once every earlier deal of the connection is answered, so that they are counted
+                    writer.write(f"{json.dumps(self.stats.to_record())}\n".encode())
+                else:
+                    try:
+                        outcome = await item
+                    except Exception as error:
+                        outcome = f"E server error: {error}"
+                    writer.write(f"{outcome}\n".encode())
+                if pending.empty():
+                    await writer.drain()
+
+        writer_task = asyncio.get_running_loop().create_task(write_outcomes())
+        try:
+            async for raw_line in reader:
+                line = raw_line.decode(errors="replace").strip()
+                if not line:
+                    continue
+                pending.put_nowait(STATS_COMMAND if line == STATS_COMMAND else self.submit(line))
+        finally:
+            pending.put_nowait(None)
+            await writer_task
+            writer.close()
+            await writer.wait_closed()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 5454, unix_path: str | None = None) -> asyncio.Server:
+        """
+        :param host:        The TCP address to listen on
+        :param port:        The TCP port to listen on
+        :param unix_path:   Listen on this Unix socket instead of TCP
+        :return: The listening server
+        """
+        self.start()
+        if unix_path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+async def request_outcomes(port: int, lines: Sequence[str], host: str = "127.0.0.1") -> List[str]:
+    """
+    Send lines to a running server over one connection, as a network client would.
+
+    :return: The server's response to each line, in order
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write("".join(f"{line}\n" for line in lines).encode())
+        await writer.drain()
+        writer.write_eof()
+        return [(await reader.readline()).decode().strip() for _line in lines]
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+class InProcessClient(metaclass=ABCMeta):
+    """
+    Stands in for a network client by submitting deals straight to a server's queue, so that the batching and the
+    evaluator can be exercised without a socket.
+    """
+    server: PokerServer
+
+    def __init__(self, server: PokerServer):
+        super().__init__()
+        self.server = server
+
+    async def evaluate(self, lines: Sequence[str]) -> List[str]:
+        """
+        :param lines:   Deals, and STATS_COMMAND lines
+        :return: The response to each line, in order, as a network client would read them
+        """
+        self.server.start()
+        # A stats request is answered once every earlier deal is, like handle_connection does
+        pending = [line if line == STATS_COMMAND else self.server.submit(line) for line in lines]
+        responses: List[str] = []
+        for item in pending:
+            if isinstance(item, str):
+                responses.append(json.dumps(self.server.stats.to_record()))
+                continue
+            try:
+                responses.append(await item)
+            except Exception as error:
+                responses.append(f"E server error: {error}")
+        return responses
+
+
+async def run_self_check(path: str = POKER_FILE, clients: int = 8,
+                         over_socket: bool = False) -> Tuple[int, Dict[str, float | int]]:
+    """
+    Evaluate the problem 54 deals through concurrent clients.
+
+    :param path:        A file of deals in the 0054_poker.txt format
+    :param clients:     The number of clients sharing the deals
+    :param over_socket: Connect the clients to a server on an ephemeral loopback port, rather than in-process
+    :return: The number of deals won by player 1, and the server's counters
+    """
+    with open(path, "r") as source_file:
+        deals = [line.strip() for line in source_file if line.strip()]
+    shares = [deals[client::clients] for client in range(0, clients)]
+    server = PokerServer()
+    try:
+        if over_socket:
+            listener = await server.serve(port=0)
+            try:
+                port = listener.sockets[0].getsockname()[1]
+                outcomes = await asyncio.gather(*(request_outcomes(port, share) for share in shares))
+            finally:
+                listener.close()
+                await listener.wait_closed()
+        else:
+            outcomes = await asyncio.gather(*(InProcessClient(server).evaluate(share) for share in shares))
+    finally:
+        await server.stop()
+    return sum(outcome == "1" for share_outcomes in outcomes for outcome in share_outcomes), server.stats.to_record()
+
+
+async def serve_forever(host: str, port: int, unix_path: str | None, batch_window: float) -> None:
+    server = PokerServer(batch_window=batch_window)
+    listener = await server.serve(host, port, unix_path)
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve poker hand evaluations over TCP or a Unix socket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5454)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--batch-window", type=float, default=0.002, help="seconds to wait for a batch to fill")
+    parser.add_argument("--self-check", action="store_true",
+                        help="evaluate the problem 54 deals through in-process clients and exit")
+    parser.add_argument("--over-socket", action="store_true",
+                        help="run the self-check through clients connected over a loopback TCP socket instead")
+    args = parser.parse_args()
+
+    if args.self_check:
+        start_time = time.time()
+        result, counters = asyncio.run(run_self_check(over_socket=args.over_socket))
+        end_time = time.time()
+        print(f"Result: {result}\nStats: {json.dumps(counters)}\nTime: {end_time - start_time}")
+    else:
+        asyncio.run(serve_forever(args.host, args.port, args.unix, args.batch_window))
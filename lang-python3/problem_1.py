@@ -2,6 +2,8 @@ import bisect
 import time
 from typing import Generator, Dict, Iterable, List, Tuple
 
+from numtheory import subset_lcms
+
 """
 <p>If we list all the natural numbers below $10$ that are multiples of $3$ or $5$, we get $3, 5, 6$ and $9$. The sum of these multiples is $23$.</p>
 <p>Find the sum of all the multiples of $3$ or $5$ below $1000$.</p>
@@ -77,10 +79,28 @@ def generate_next_multiple_sorted_list(numbers: Iterable[int]) -> Generator[int,
 
         yield next_value
 
+def solve_with_inclusion_exclusion(max_value: int, bases: Iterable[int] = (3, 5)) -> int:
+    """
+    Sum the multiples of each base, subtract those of each pair's least common multiple (counted twice), add back those
+    of each triple's, and so on.  The multiples of m below max_value sum to m * k * (k + 1) / 2, with
+    k = (max_value - 1) // m, so subsets whose least common multiple reaches max_value add nothing and are skipped.
+
+    :param max_value:   The exclusive upper bound
+    :param bases:       The numbers whose multiples are summed
+    :return: The sum of the numbers below max_value that are a multiple of any base
+    """
+    total = 0
+    for multiple, subset_size in subset_lcms(list(bases), max_value - 1):
+        sign = 1 if subset_size % 2 == 1 else -1
+        count = (max_value - 1) // multiple
+        total += sign * multiple * count * (count + 1) // 2
+    return total
+
 
 if __name__ == "__main__":
     start = time.time()
-    result = solve_with_sorted_list_generator(1000) #10000000
+    # result = solve_with_sorted_list_generator(1000) #10000000
+    result = solve_with_inclusion_exclusion(1000)
     end = time.time()
 
     print(f"Result: {result}\nTime: {end-start}")
@@ -0,0 +1,109 @@
+"""
+<p>Each new term in the Fibonacci sequence is generated by adding the previous two terms. By starting with $1$ and $2$, the first $10$ terms will be:
+$$1, 2, 3, 5, 8, 13, 21, 34, 55, 89, \dots$$</p>
+<p>By considering the terms in the Fibonacci sequence whose values do not exceed four million, find the sum of the even-valued terms.</p>
+"""
+import math
+import time
+from typing import Generator, Tuple
+
+
+# Indexed from F(0) = 0, F(1) = 1, so the problem's sequence 1, 2, 3, 5, ... is F(2), F(3), F(4), ...
+_LOG_PHI: float = math.log((1 + math.sqrt(5)) / 2)
+_LOG_SQRT_5: float = math.log(math.sqrt(5))
+
+
+def fibonacci_generator(max_value: int | None = None) -> Generator[int, None, None]:
+    """
+    :param max_value:   [optional] The largest value to yield
+    :return: The Fibonacci numbers 1, 2, 3, 5, ... up to max_value
+    """
+    previous, current = 1, 2
+    while max_value is None or previous <= max_value:
+        yield previous
+        previous, current = current, previous + current
+
+
+def fib_pair(n: int, modulus: int | None = None) -> Tuple[int, int]:
+    """
+    Fast doubling, reading the bits of n from the most significant:
+        F(2k) = F(k) * (2 * F(k + 1) - F(k))
+        F(2k + 1) = F(k)^2 + F(k + 1)^2
+
+    :param n:       The index, 0 or more
+    :param modulus: [optional] Reduce the results modulo this
+    :return: F(n) and F(n + 1), reduced modulo the modulus if one is given
+    """
+    if n < 0:
+        raise ValueError(f"Negative Fibonacci index: {n}")
+    current, following = 0, 1
+    for bit in bin(n)[2:]:
+        doubled = current * (2 * following - current)
+        doubled_next = current * current + following * following
+        if modulus is not None:
+            doubled %= modulus
+            doubled_next %= modulus
+        if bit == "1":
+            current, following = doubled_next, doubled + doubled_next
+            if modulus is not None:
+                following %= modulus
+        else:
+            current, following = doubled, doubled_next
+    return current, following
+
+
+def fib(n: int, modulus: int | None = None) -> int:
+    """
+    :param n:       The index, 0 or more
+    :param modulus: [optional] Reduce the result modulo this
+    :return: F(n), in O(log n) multiplications
+    """
+    return fib_pair(n, modulus)[0]
+
+
+def largest_index_not_exceeding(max_value: int) -> int:
+    """
+    :param max_value:   A bound of 1 or more
+    :return: The largest n with F(n) <= max_value
+    """
+    # F(n) is the nearest integer to phi^n / sqrt(5), so the estimate is at most one or two away
+    n = max(1, int((math.log(max_value) + _LOG_SQRT_5) / _LOG_PHI))
+    current, following = fib_pair(n)
+    while current > max_value:
+        n -= 1
+        current, following = following - current, current
+    while following <= max_value:
+        n += 1
+        current, following = following, current + following
+    return n
+
+
+def solve_with_generator(max_value: int) -> int:
+    total = 0
+    for value in fibonacci_generator(max_value):
+        if value % 2 == 0:
+            total += value
+    return total
+
+
+def solve_with_fast_doubling(max_value: int) -> int:
+    """
+    Every third Fibonacci number, F(3k), is even, and F(3) + F(6) + ... + F(3k) = (F(3k + 2) - 1) / 2.  So the sum
+    only needs the last even index below the bound and one fast-doubling evaluation.
+
+    :param max_value:   The largest term to include
+    :return: The sum of the even Fibonacci numbers not exceeding max_value
+    """
+    if max_value < 2:
+        return 0
+    last_even_index = largest_index_not_exceeding(max_value) // 3 * 3
+    return (fib(last_even_index + 2) - 1) // 2
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    # result = solve_with_generator(4000000)
+    result = solve_with_fast_doubling(4000000)
+    end_time = time.time()
+
+    print(f"Result: {result}\nTime: {end_time-start_time}")
@@ -1,4 +1,6 @@
 import time
+from abc import ABCMeta
+from array import array
 from typing import List, Generator
 
 
@@ -116,6 +118,117 @@ def get_combination_count(denominations: List[int], amount: int) -> int:
             remainder -= denomination
     return count
 
+def greedy_change(amount: int, denominations: List[int]) -> List[int]:
+    """
+    :param amount:          The amount to make
+    :param denominations:   The coin denominations, largest first, ending with 1
+    :return: The number of coins of each denomination the greedy method takes, in denomination order
+    """
+    coins = [0] * len(denominations)
+    for idx, denomination in enumerate(denominations):
+        coins[idx], amount = divmod(amount, denomination)
+    return coins
+
+
+def greedy_coin_count(amount: int, denominations: List[int]) -> int:
+    """
+    :return: The number of coins the greedy method takes to make the amount from the denominations, largest first
+    """
+    count = 0
+    for denomination in denominations:
+        coins, amount = divmod(amount, denomination)
+        count += coins
+    return count
+
+
+def find_greedy_counterexample(denominations: List[int]) -> int | None:
+    """
+    Pearson's test (1994).  Number the coins c_1 > c_2 > ... > c_n = 1.  If greedy is not optimal, the smallest amount
+    where it fails is made optimally by the greedy coins for c_(i-1) - 1 taken from c_1 to c_(j-1), plus one more c_j,
+    for some 2 <= i <= j <= n.  That leaves O(n^2) candidate amounts, each checked in O(n) against greedy, rather than
+    the c_(n-1) + 3 to c_1 + c_2 window of Kozen and Zaks that a table would have to cover.
+
+    :param denominations:   The coin denominations, in any order, including 1
+    :return: The smallest amount that greedy makes with more coins than necessary, or None if the system is canonical
+    """
+    coins = sorted(set(denominations), reverse=True)
+    if coins[-1] != 1:
+        raise ValueError(f"Denominations must include 1: {denominations}")
+    smallest: int | None = None
+    for i in range(1, len(coins)):
+        greedy_below = greedy_change(coins[i - 1] - 1, coins)
+        prefix_value = 0
+        prefix_count = 0
+        for j in range(i, len(coins)):
+            amount = prefix_value + (greedy_below[j] + 1) * coins[j]
+            if (smallest is None or amount < smallest) and \
+                    greedy_coin_count(amount, coins) > prefix_count + greedy_below[j] + 1:
+                smallest = amount
+            prefix_value += greedy_below[j] * coins[j]
+            prefix_count += greedy_below[j]
+    return smallest
+
+
+def is_canonical(denominations: List[int]) -> bool:
+    """
+    :return: True if the greedy method makes every amount with the fewest coins
+    """
+    return find_greedy_counterexample(denominations) is None
+
+
+def get_min_coin_counts(limit: int, denominations: List[int]) -> array:
+    """
+    :param limit:           The largest amount to tabulate
+    :param denominations:   The coin denominations, including 1
+    :return: The fewest coins making each amount from 0 to the limit
+    """
+    counts = array("I", range(0, limit + 1))
+    for denomination in sorted(set(denominations)):
+        for amount in range(denomination, limit + 1):
+            with_coin = counts[amount - denomination] + 1
+            if with_coin < counts[amount]:
+                counts[amount] = with_coin
+    return counts
+
+
+class ChangeMaker(metaclass=ABCMeta):
+    """
+    Answers the fewest coins for many amounts: in O(len(denominations)) per amount by the greedy method when the
+    coin system is canonical, and otherwise from a table computed once up to a limit.
+    """
+    denominations: List[int]
+    counterexample: int | None
+    limit: int | None
+    min_coin_counts: array | None
+
+    def __init__(self, denominations: List[int], limit: int | None = None):
+        """
+        :param denominations:   The coin denominations, including 1
+        :param limit:           The largest amount to answer if the system is not canonical
+        """
+        super().__init__()
+        self.denominations = sorted(set(denominations), reverse=True)
+        self.counterexample = find_greedy_counterexample(self.denominations)
+        self.limit = limit
+        self.min_coin_counts = None
+        if self.counterexample is not None:
+            if limit is None:
+                raise ValueError(f"{self.denominations} is not canonical (greedy fails at {self.counterexample}), "
+                                 f"so a table limit is required")
+            self.min_coin_counts = get_min_coin_counts(limit, self.denominations)
+
+    @property
+    def canonical(self) -> bool:
+        return self.counterexample is None
+
+    def min_coins(self, amount: int) -> int:
+        if self.min_coin_counts is None:
+            return greedy_coin_count(amount, self.denominations)
+        if amount > self.limit:
+            raise ValueError(f"Amount {amount} is beyond the table limit {self.limit}")
+        return self.min_coin_counts[amount]
+
+
 if __name__ == "__main__":
     coin_denominations: List[int] = [200, 100, 50, 20, 10, 5, 2, 1]
     # denominations: List[int] = [100, 50, 10]
@@ -124,6 +237,7 @@ if __name__ == "__main__":
 
     # result = get_combinations_brute_force(target_amount, coin_denominations)
     result = get_combinations_with_tuples(target_amount, coin_denominations)
+    # result = ChangeMaker(coin_denominations).min_coins(target_amount)
 
 
     end_time = time.time()
@@ -0,0 +1,171 @@
+"""
+<p>A palindromic number reads the same both ways. The largest palindrome made from the product of two $2$-digit numbers is $9009 = 91 \times 99$.</p>
+<p>Find the largest palindrome made from the product of two $3$-digit numbers.</p>
+"""
+import math
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Deque, Tuple
+
+
+# Rather than multiplying factor pairs and testing the products, the solvers below walk the palindromes from the
+# largest down and stop at the first one with a factor pair in range.  The palindromes of each length are built from
+# their first half, so walking them in descending order is walking the first halves in descending order.
+FactorPair = Tuple[int, int] | None
+
+
+def is_palindrome(value: int) -> bool:
+    digits = str(value)
+    return digits == digits[::-1]
+
+
+def palindrome_from_half(half: int, length: int) -> int:
+    """
+    :param half:    The first ceil(length / 2) digits
+    :param length:  The palindrome's number of digits
+    :return: The palindrome of the given length starting with the given digits
+    """
+    half_digits = str(half)
+    return int(half_digits + half_digits[:length // 2][::-1])
+
+
+def find_factor_pair_by_division(palindrome: int, digits: int) -> FactorPair:
+    """
+    Try the divisors whose cofactor is also in range, that is those from palindrome / high to palindrome / low.  An
+    even-length palindrome is a multiple of 11, and 11 is prime, so one of its factors is a multiple of 11 and only
+    those need to be tried.
+
+    :param palindrome:  The number to split
+    :param digits:      The number of digits of both factors
+    :return: A factor pair with the given number of digits, or None
+    """
+    low, high = 10 ** (digits - 1), 10 ** digits - 1
+    first = max(low, -(-palindrome // high))
+    last = min(high, palindrome // low)
+    step = 1
+    if len(str(palindrome)) % 2 == 0:
+        step = 11
+        last -= last % 11
+    for factor in range(last, first - 1, -step):
+        if palindrome % factor == 0:
+            return max(factor, palindrome // factor), min(factor, palindrome // factor)
+    return None
+
+
+def find_factor_pair_by_complement(palindrome: int, digits: int) -> FactorPair:
+    """
+    Write the factors as N - x and N - y with N = 10^digits, so that palindrome = N^2 - sN + t with s = x + y and
+    t = xy.  Each s fixes t, and x and y are then the roots of z^2 - sz + t, which are integers when s^2 - 4t is a
+    square.  t grows by N with each step of s while s^2 / 4 grows by only about s / 2, so for products close to N^2
+    only a handful of s can satisfy t <= s^2 / 4.
+
+    :param palindrome:  The number to split
+    :param digits:      The number of digits of both factors
+    :return: A factor pair with the given number of digits, or None
+    """
+    base = 10 ** digits
+    low = 10 ** (digits - 1)
+    sum_of_complements = max(0, -(-(base * base - palindrome) // base))
+    product_of_complements = palindrome - base * base + sum_of_complements * base
+    while 4 * product_of_complements <= sum_of_complements * sum_of_complements:
+        discriminant = sum_of_complements * sum_of_complements - 4 * product_of_complements
+        root = math.isqrt(discriminant)
+        if root * root == discriminant and (sum_of_complements - root) % 2 == 0:
+            smaller_complement = (sum_of_complements - root) // 2
+            larger_complement = sum_of_complements - smaller_complement
+            if smaller_complement >= 1 and base - larger_complement >= low:
+                return base - smaller_complement, base - larger_complement
+        sum_of_complements += 1
+        product_of_complements += base
+    return None
+
+
+def _search_halves(length: int, digits: int, first_half: int, last_half: int,
+                   find_factor_pair: Callable[[int, int], FactorPair]) -> Tuple[int, int, int] | None:
+    """
+    :return: The largest palindrome of the given length built from a half in [last_half, first_half] that has a factor
+             pair with the given number of digits, and the pair; or None
+    """
+    for half in range(first_half, last_half - 1, -1):
+        palindrome = palindrome_from_half(half, length)
+        pair = find_factor_pair(palindrome, digits)
+        if pair is not None:
+            return palindrome, pair[0], pair[1]
+    return None
+
+
+def largest_palindrome_product(digits: int, find_factor_pair: Callable[[int, int], FactorPair], workers: int = 1,
+                               chunk_size: int = 5000) -> Tuple[int, int, int]:
+    """
+    Search the palindrome lengths a product of two numbers with the given digits can have, longest first.  With more
+    than one worker the first halves are split into descending ranges of chunk_size for a process pool, which is kept
+    one range per worker ahead of the range being waited on.  Results are read in range order, so the first range
+    holding a result holds the largest one.
+
+    :param digits:              The number of digits of both factors
+    :param find_factor_pair:    Splits a palindrome into a factor pair with the given digits, or returns None
+    :param workers:             The number of processes to search with
+    :param chunk_size:          The number of first halves in each range given to a process
+    :return: The largest palindrome product and its factors
+    """
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for length in range(2 * digits, 2 * digits - 2, -1):
+            half_length = (length + 1) // 2
+            first_half, last_half = 10 ** half_length - 1, 10 ** (half_length - 1)
+            if executor is None:
+                found = _search_halves(length, digits, first_half, last_half, find_factor_pair)
+                if found is not None:
+                    return found
+                continue
+
+            range_starts = iter(range(first_half, last_half - 1, -chunk_size))
+            pending: Deque[Future] = deque()
+            while True:
+                for start in islice(range_starts, workers + 1 - len(pending)):
+                    pending.append(executor.submit(_search_halves, length, digits, start,
+                                                   max(last_half, start - chunk_size + 1), find_factor_pair))
+                if not pending:
+                    break
+                found = pending.popleft().result()
+                if found is not None:
+                    return found
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    raise ValueError(f"No palindrome is a product of two {digits}-digit numbers")
+
+
+def solve_with_brute_force(digits: int) -> int:
+    low, high = 10 ** (digits - 1), 10 ** digits - 1
+    largest = 0
+    for factor in range(high, low - 1, -1):
+        if factor * high <= largest:
+            break
+        for cofactor in range(high, factor - 1, -1):
+            product = factor * cofactor
+            if product <= largest:
+                break
+            if is_palindrome(product):
+                largest = product
+    return largest
+
+
+def solve_with_divisor_search(digits: int, workers: int = 1) -> int:
+    return largest_palindrome_product(digits, find_factor_pair_by_division, workers)[0]
+
+
+def solve_with_complement_search(digits: int, workers: int = 1) -> int:
+    return largest_palindrome_product(digits, find_factor_pair_by_complement, workers)[0]
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    # result = solve_with_brute_force(3)
+    # result = solve_with_divisor_search(3)
+    result = solve_with_complement_search(3)
+    end_time = time.time()
+
+    print(f"Result: {result}\nTime: {end_time-start_time}")
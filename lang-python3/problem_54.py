@@ -1,8 +1,12 @@
+import heapq
+import itertools
+import os
 import re
 import time
-from abc import ABCMeta
+from abc import ABCMeta, abstractmethod
 from enum import Enum
-from typing import Literal, List, Set, Any, cast, Iterable, Tuple, Dict
+from functools import total_ordering
+from typing import Literal, List, Set, Any, cast, Iterable, Tuple, Dict, Sequence
 
 
 # In the card game poker, a hand consists of five cards and are ranked, from lowest to highest, in the following way:
@@ -40,6 +44,9 @@ from typing import Literal, List, Set, Any, cast, Iterable, Tuple, Dict
 #
 # How many hands does Player 1 win?
 
+POKER_FILE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "0054_poker.txt")
+
+
 class HandType(Enum):
     HighCard = 0
     OnePair = 1
@@ -79,17 +86,49 @@ class Card(metaclass=ABCMeta):
         return f"{value_str} {self.suit}"
 
 
+@total_ordering
 class Hand(metaclass=ABCMeta):
     """
     Abstract base class for a Hand composed of 5 cards.  Each hand has a type and the ability to compare
     itself to other hands to determine which, if either, has higher value.
+
+    Hands are also totally ordered by their sort key, the hand type followed by the card values in order of
+    significance, so that they can be sorted, heaped, and compared with < and == without pairwise compare_to calls.
+    Hands of equal value but different suits compare equal.
     """
 
     type: HandType
+    _sort_key: Tuple[int, ...] | None
 
     def __init__(self, type: HandType):
         super().__init__()
         self.type = type
+        self._sort_key = None
+
+    @abstractmethod
+    def rank_values(self) -> Tuple[int, ...]:
+        """
+        :return: The card values deciding between two hands of this type, most significant first
+        """
+        ...
+
+    def sort_key(self) -> Tuple[int, ...]:
+        if self._sort_key is None:
+            self._sort_key = (self.type.value,) + self.rank_values()
+        return self._sort_key
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Hand):
+            return NotImplemented
+        return self.sort_key() == other.sort_key()
+
+    def __lt__(self, other: Any) -> bool:
+        if not isinstance(other, Hand):
+            return NotImplemented
+        return self.sort_key() < other.sort_key()
+
+    def __hash__(self) -> int:
+        return hash(self.sort_key())
 
     def compare_to(self, other: Any) -> int:
         """
@@ -113,6 +152,9 @@ class HighCardHand(Hand):
         assert len(cards) == 5
         self.cards = cards
 
+    def rank_values(self) -> Tuple[int, ...]:
+        return tuple(card.value for card in self.cards)
+
     def compare_to(self, other: Hand) -> int:
         type_comparison = super().compare_to(other)
         if type_comparison != 0:
@@ -133,6 +175,9 @@ class OnePairHand(Hand):
         self.pair = pair
         self.kickers = kickers
 
+    def rank_values(self) -> Tuple[int, ...]:
+        return (self.pair[0].value,) + tuple(card.value for card in self.kickers)
+
     def compare_to(self, other: Hand) -> int:
         type_comparison = super().compare_to(other)
         if type_comparison != 0:
@@ -159,6 +204,9 @@ class TwoPairsHand(Hand):
         self.low_pair = low_pair
         self.kicker = kicker
 
+    def rank_values(self) -> Tuple[int, ...]:
+        return self.high_pair[0].value, self.low_pair[0].value, self.kicker.value
+
     def compare_to(self, other: Hand) -> int:
         type_comparison = super().compare_to(other)
         if type_comparison != 0:
@@ -185,6 +233,9 @@ class ThreeOfAKindHand(Hand):
         self.triple = triple
         self.kickers = kickers
 
+    def rank_values(self) -> Tuple[int, ...]:
+        return (self.triple[0].value,) + tuple(card.value for card in self.kickers)
+
     def compare_to(self, other: Hand) -> int:
         type_comparison = super().compare_to(other)
         if type_comparison != 0:
@@ -205,6 +256,9 @@ class StraightHand(Hand):
         assert len(cards) == 5
         self.cards = cards
 
+    def rank_values(self) -> Tuple[int, ...]:
+        return (self.cards[0].value,)
+
     def compare_to(self, other: Hand) -> int:
         type_comparison = super().compare_to(other)
         if type_comparison != 0:
@@ -222,6 +276,9 @@ class FlushHand(Hand):
         assert len(cards) == 5
         self.cards = cards
 
+    def rank_values(self) -> Tuple[int, ...]:
+        return tuple(card.value for card in self.cards)
+
     def compare_to(self, other: Hand) -> int:
         type_comparison = super().compare_to(other)
         if type_comparison != 0:
@@ -242,6 +299,9 @@ class FullHouseHand(Hand):
         self.triple = triple
         self.pair = pair
 
+    def rank_values(self) -> Tuple[int, ...]:
+        return self.triple[0].value, self.pair[0].value
+
     def compare_to(self, other: Hand) -> int:
         type_comparison = super().compare_to(other)
         if type_comparison != 0:
@@ -265,6 +325,9 @@ class FourOfAKindHand(Hand):
         self.quadruple = quadruple
         self.kicker = kicker
 
+    def rank_values(self) -> Tuple[int, ...]:
+        return self.quadruple[0].value, self.kicker.value
+
     def compare_to(self, other: Hand) -> int:
         type_comparison = super().compare_to(other)
         if type_comparison != 0:
@@ -282,6 +345,9 @@ class StraightFlushHand(Hand):
         assert len(cards) == 5
         self.cards = cards
 
+    def rank_values(self) -> Tuple[int, ...]:
+        return (self.cards[0].value,)
+
     def compare_to(self, other: Hand) -> int:
         type_comparison = super().compare_to(other)
         if type_comparison != 0:
@@ -447,10 +513,87 @@ def to_card(serialized_card: str) -> Card:
             raise AssertionError(f"Cannot parse suit from serialized card: {serialized_card}")
 
 
-if __name__ == "__main__":
+def rank_showdown(hands: Sequence[Hand]) -> List[List[int]]:
+    """
+    Rank the hands of a showdown by sorting on their keys, computed once per hand.
+
+    :param hands:   The hands of each player, indexed by player
+    :return: The players grouped by equal hand value, best group first.  The first group holds the winners, and each
+             group with more than one player splits its share of the pot.
+    """
+    order = sorted(range(0, len(hands)), key=lambda player: hands[player].sort_key(), reverse=True)
+    return [list(players) for _key, players in itertools.groupby(order, key=lambda player: hands[player].sort_key())]
 
+
+class HandLeaderboard(metaclass=ABCMeta):
+    """
+    The best k hands offered so far, kept in a min-heap of size k so that memory stays bounded however many hands are
+    offered.  Each offer costs one comparison against the weakest kept hand, plus O(log k) when it displaces it.  Of
+    equal hands the earliest offered are kept.
+    """
+    capacity: int
+    offered: int
+    _heap: List[Tuple[Tuple[int, ...], int, Any, Hand]]
+
+    def __init__(self, capacity: int):
+        """
+        :param capacity:    The number of hands to keep, at least 1
+        :raises ValueError: if the capacity is below 1
+        """
+        super().__init__()
+        if capacity < 1:
+            raise ValueError(f"A leaderboard must keep at least one hand, not {capacity}")
+        self.capacity = capacity
+        self.offered = 0
+        self._heap = []
+
+    def offer(self, hand: Hand, label: Any = None) -> bool:
+        """
+        :param hand:    The hand to consider
+        :param label:   Identifies the hand, such as a deal and player number
+        :return: True if the hand is now on the leaderboard
+        """
+        self.offered += 1
+        # Later offers sort lower among equal hands, so they are the first to be displaced
+        entry = (hand.sort_key(), -self.offered, label, hand)
+        if len(self._heap) < self.capacity:
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry[:2] <= self._heap[0][:2]:
+            return False
+        heapq.heapreplace(self._heap, entry)
+        return True
+
+    def top(self) -> List[Tuple[Hand, Any]]:
+        """
+        :return: The kept hands and their labels, best first
+        """
+        return [(hand, label) for _key, _order, label, hand in sorted(self._heap, reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def top_hands(hands: Iterable[Tuple[Hand, Any]], k: int) -> List[Tuple[Hand, Any]]:
+    """
+    :param hands:   A stream of hands and their labels
+    :param k:       The number of hands to return
+    :return: The best k hands and their labels in a single pass, best first
+    """
+    if k < 1:
+        return []
+    leaderboard = HandLeaderboard(k)
+    for hand, label in hands:
+        leaderboard.offer(hand, label)
+    return leaderboard.top()
+
+
+def count_player_1_victories(path: str = POKER_FILE) -> int:
+    """
+    :param path:    A file of deals, each line holding player 1's five cards followed by player 2's
+    :return: The number of deals won by player 1
+    """
     player_1_victories = 0
-    start_time = time.time()
 
     #     cards = """
     # 5H 5C 6S 7S KD 2C 3S 8S 8D TD
@@ -462,7 +605,7 @@ if __name__ == "__main__":
     #     lines = cards.split("\n")
     #     for line in lines:
 
-    with open("0054_poker.txt", "r") as source_file:
+    with open(path, "r") as source_file:
         for line in source_file:
             line = line.strip()
             serialized_cards = line.split(" ")
@@ -477,6 +620,14 @@ if __name__ == "__main__":
                 raise AssertionError("There must not be poker ties")
             else:
                 continue
+    return player_1_victories
+
+
+if __name__ == "__main__":
+
+    start_time = time.time()
+
+    player_1_victories = count_player_1_victories()
 
     end_time = time.time()
 
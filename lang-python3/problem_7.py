@@ -4,7 +4,11 @@
 """
 import time
 import math
-from typing import List, Generator
+from itertools import islice
+from typing import List
+
+from numtheory import PrimeSieve, incremental_prime_generator, nth_prime_upper_bound, \
+    segmented_eratosthanes_prime_generator
 
 
 def get_nth_prime_div_test(prime_idx: int) -> int:
@@ -27,61 +31,19 @@ def get_nth_prime_sieve_of_eratosthenes(prime_idx: int) -> int:
         if idx == prime_idx - 1:
             return prime
 
-def segmented_eratosthanes_prime_generator(segment_size: int = 100000) -> Generator[int, None, None]:
-    primes: List[int] = []
-    generator_index: int = 0
-    offset: int = 2
-
-    # Generate the first segment normally
-    prime_test = [True for _ in range(segment_size)]
-    i = 2
-    while i - offset < segment_size:
-        if prime_test[i - offset]:
-            j = i*i
-            while j - offset < segment_size:
-                prime_test[j - offset] = False
-                j += i
-        i += 1
-    for idx, is_prime in enumerate(prime_test):
-        if is_prime:
-            primes.append(idx + offset)
-    del prime_test
-    offset += segment_size
-
-    while True:
-        while generator_index == len(primes):
-            primes = primes + primes_in_next_eratosthanes_segment(primes, offset, segment_size)
-            offset += segment_size
-
-        yield primes[generator_index]
-        generator_index += 1
-
-def primes_in_next_eratosthanes_segment(primes, offset, segment_size) -> List[int]:
-    prime_test: List[bool] = [True for _ in range(segment_size)]
-    i: int = offset
-    sqrt_max_value: float = math.sqrt(i + segment_size)
-    for prime in primes:
-        if prime > sqrt_max_value:
-            break
-        j: int = (i // prime) * prime
-        while j - offset < segment_size:
-            if j - offset < 0:
-                j += prime
-                continue
-            prime_test[j - offset] = False
-            j += prime
+def get_nth_prime_incremental_sieve(prime_idx: int) -> int:
+    return next(islice(incremental_prime_generator(), prime_idx - 1, None))
 
-    segment_primes = []
-    for idx, is_prime in enumerate(prime_test):
-        if is_prime:
-            segment_primes.append(idx + offset)
-    return segment_primes
+def get_nth_prime_smallest_factor_sieve(prime_idx: int) -> int:
+    return PrimeSieve(nth_prime_upper_bound(prime_idx)).primes[prime_idx - 1]
 
 
 if __name__ == "__main__":
     start_time = time.time()
     # result = get_nth_prime_div_test(1000001)
-    result = get_nth_prime_sieve_of_eratosthenes(1000001)
+    # result = get_nth_prime_sieve_of_eratosthenes(1000001)
+    # result = get_nth_prime_incremental_sieve(1000001)
+    result = get_nth_prime_smallest_factor_sieve(1000001)
     end_time = time.time()
 
     print(f"Result: {result}\nTime: {end_time-start_time}")
\ No newline at end of file
@@ -0,0 +1,128 @@
+import importlib.util
+import os
+import sys
+from abc import ABCMeta
+from types import FunctionType, ModuleType
+from typing import Any, Callable, Dict, List, Tuple
+
+
+# The registry of problem modules and their solvers.  Problems that ship an input file live in their own directory
+# next to it.  Nothing here imports a problem module until load_problem is called for it.
+ROOT_DIRECTORY: str = os.path.dirname(os.path.abspath(__file__))
+
+
+class Problem(metaclass=ABCMeta):
+    number: int
+    module_path: str
+    solver_prefixes: Tuple[str, ...]
+    default_solver: str
+    default_parameters: Tuple[Any, ...]
+    input_file: str | None
+    input_arguments: Callable[[ModuleType, str, str], Tuple]
+
+    def __init__(self, number: int, module_path: str, solver_prefixes: Tuple[str, ...], default_solver: str,
+                 default_parameters: Tuple[Any, ...] = (), input_file: str | None = None,
+                 input_arguments: Callable[[ModuleType, str, str], Tuple] = lambda module, solver, path: (path,)):
+        """
+        :param number:              The problem number
+        :param module_path:         The module's path relative to this directory
+        :param solver_prefixes:     The name prefixes of the module's competing solver functions
+        :param default_solver:      The solver to run when none is chosen
+        :param default_parameters:  The solver arguments to use when none are given
+        :param input_file:          The input file shipped next to the module, if the problem reads one
+        :param input_arguments:     Converts the module, solver name, and input path into the solver's input arguments
+        """
+        self.number = number
+        self.module_path = module_path
+        self.solver_prefixes = solver_prefixes
+        self.default_solver = default_solver
+        self.default_parameters = default_parameters
+        self.input_file = input_file
+        self.input_arguments = input_arguments
+
+    def find_solvers(self, module: ModuleType) -> List[Tuple[str, Callable]]:
+        """
+        :return: The module's own functions whose names start with one of the solver prefixes
+        """
+        return sorted((name, value) for name, value in vars(module).items()
+                      if isinstance(value, FunctionType) and value.__module__ == module.__name__
+                      and name.startswith(self.solver_prefixes))
+
+    def solver_arguments(self, module: ModuleType, solver: str, parameters: Tuple[Any, ...],
+                         input_path: str | None = None) -> Tuple[Any, ...]:
+        """
+        :param module:      The loaded problem module
+        :param solver:      The solver's name
+        :param parameters:  The solver's parameters
+        :param input_path:  The input file to read instead of the one shipped with the problem
+        :return: The arguments to call the solver with
+        """
+        if self.input_file is None:
+            return parameters
+        path = input_path or problem_path(self.number, self.input_file)
+        return self.input_arguments(module, solver, path) + parameters
+
+
+def _keylog_arguments(module: ModuleType, solver: str, path: str) -> Tuple:
+    if solver == "solve_bulk":
+        return (path,)
+    if solver == "solve_shortest_supersequence":
+        with open(path, "r") as source_file:
+            return ([line.strip() for line in source_file if line.strip()],)
+    return (module.read_attempt_file(path),)
+
+
+PROBLEMS: Dict[int, Problem] = {problem.number: problem for problem in [
+    Problem(1, "problem_1.py", ("solve_with_",), "solve_with_brute_force", (1000,)),
+    Problem(2, "problem_2.py", ("solve_with_",), "solve_with_fast_doubling", (4000000,)),
+    Problem(4, "problem_4.py", ("solve_with_",), "solve_with_complement_search", (3,)),
+    Problem(7, "problem_7.py", ("get_nth_prime_",), "get_nth_prime_sieve_of_eratosthenes", (10001,)),
+    Problem(31, "problem_31.py", ("get_combinations_",), "get_combinations_with_tuples",
+            (200, [200, 100, 50, 20, 10, 5, 2, 1])),
+    Problem(54, "problem_54.py", ("count_player_1_victories",), "count_player_1_victories",
+            input_file="0054_poker.txt"),
+    Problem(79, "79/problem_79.py", ("solve_",), "solve_bulk", input_file="0079_keylog.txt",
+            input_arguments=_keylog_arguments),
+    Problem(96, "96/problem_96.py", ("solve_all",), "solve_all", input_file="p096_sudoku.txt"),
+]}
+
+
+def problem_path(number: int, relative_path: str = "") -> str:
+    """
+    :param number:          The problem number
+    :param relative_path:   A file next to the problem module, or empty for the module itself
+    :return: The absolute path of the problem module or of a file next to it
+    """
+    if number not in PROBLEMS:
+        raise KeyError(f"Unknown problem: {number}")
+    module_path = os.path.join(ROOT_DIRECTORY, PROBLEMS[number].module_path)
+    if not relative_path:
+        return module_path
+    return os.path.join(os.path.dirname(module_path), relative_path)
+
+
+def load_problem(number: int) -> ModuleType:
+    """
+    Import a single problem module by path, without importing any of the others.
+    The module's directory is added to sys.path so that it can import its sibling modules.
+
+    :param number:  The problem number
+    :return: The imported module
+    """
+    path = problem_path(number)
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    module_directory = os.path.dirname(path)
+    if module_directory not in sys.path:
+        sys.path.insert(0, module_directory)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
@@ -0,0 +1,248 @@
+import cProfile
+import datetime
+import json
+import os
+import pstats
+import re
+import signal
+import sys
+import time
+import tracemalloc
+from abc import ABCMeta
+from typing import Any, Callable, Dict, List, Tuple
+
+
+# Opt-in profiling of a single solver run.  Profiling is enabled with the EULER_PROFILE environment variable or the
+# euler --profile flag, holding a comma separated list of modes (or "all"):
+#
+#   time    - wall and CPU time of the call
+#   cprofile - deterministic cProfile statistics, written as a .pstats file and as collapsed stacks for flamegraphs
+#   sample  - statistical stack samples taken on a CPU timer, written as collapsed stacks
+#   memory  - tracemalloc peak and the top allocation sites
+#
+# Every enabled mode writes its own file into EULER_PROFILE_DIR (default "profiles"), named after the problem, solver
+# and start time.  Collapsed stacks are one "frame;frame;frame count" line per stack, the input format of
+# flamegraph.pl and speedscope.  The instruments run together, so cprofile and memory inflate the time record.
+# Callers only import this module once profiling is enabled, so that it costs nothing when off.
+PROFILE_MODES: Tuple[str, ...] = ("time", "cprofile", "sample", "memory")
+PROFILE_VARIABLE: str = "EULER_PROFILE"
+PROFILE_DIRECTORY_VARIABLE: str = "EULER_PROFILE_DIR"
+
+
+class ProfileSettings(metaclass=ABCMeta):
+    modes: Tuple[str, ...]
+    output_directory: str
+    sample_interval: float
+    top_allocations: int
+
+    def __init__(self, modes: Tuple[str, ...], output_directory: str = "profiles", sample_interval: float = 0.001,
+                 top_allocations: int = 25):
+        """
+        :param modes:               The enabled profiling modes
+        :param output_directory:    The directory to write the profile files to
+        :param sample_interval:     The CPU time between stack samples in seconds
+        :param top_allocations:     The number of allocation sites to keep in the memory snapshot
+        """
+        unknown_modes = [mode for mode in modes if mode not in PROFILE_MODES]
+        if unknown_modes:
+            raise ValueError(f"Unknown profiling modes: {', '.join(unknown_modes)}")
+        self.modes = modes
+        self.output_directory = output_directory
+        self.sample_interval = sample_interval
+        self.top_allocations = top_allocations
+
+
+def parse_modes(value: str | None) -> Tuple[str, ...]:
+    """
+    :param value:   A comma separated list of modes, "all", or a true/false flag value
+    :return: The enabled modes, empty when profiling is off
+    """
+    if not value or value.strip().lower() in ("0", "false", "no", "off"):
+        return ()
+    if value.strip().lower() in ("1", "true", "yes", "on", "all"):
+        return PROFILE_MODES
+    return tuple(mode.strip().lower() for mode in value.split(",") if mode.strip())
+
+
+def settings_from_environment(modes: str | None = None, output_directory: str | None = None) -> ProfileSettings | None:
+    """
+    :param modes:               Modes given on the command line, which take precedence over EULER_PROFILE
+    :param output_directory:    A directory given on the command line, which takes precedence over EULER_PROFILE_DIR
+    :return: The profiling settings, or None when profiling is off
+    """
+    enabled_modes = parse_modes(modes if modes is not None else os.environ.get(PROFILE_VARIABLE))
+    if not enabled_modes:
+        return None
+    return ProfileSettings(enabled_modes, output_directory or os.environ.get(PROFILE_DIRECTORY_VARIABLE, "profiles"))
+
+
+def _frame_name(file_name: str, line_number: int, function_name: str) -> str:
+    if file_name == "~":
+        # Built-in functions, such as "<method 'remove' of 'list' objects>"
+        return function_name
+    return f"{function_name} ({os.path.basename(file_name)}:{line_number})"
+
+
+def collapsed_cprofile_stacks(stats: Any, min_microseconds: float = 1.0) -> Dict[str, int]:
+    """
+    Reconstruct collapsed stacks from cProfile statistics.  cProfile only records caller-callee pairs, so each
+    function's own time is split between its call paths in proportion to the cumulative time of each caller edge.
+    Paths through recursion are cut at the first repeated function.
+
+    :param stats:               A pstats.Stats object
+    :param min_microseconds:    Paths carrying less own time than this are dropped
+    :return: The own time in microseconds of each ";" separated stack, outermost frame first
+    """
+    raw_stats: Dict[Tuple, Tuple] = stats.stats
+    stacks: Dict[str, int] = {}
+
+    def caller_paths(function: Tuple, visited: frozenset, weight: float) -> List[Tuple[List[Tuple], float]]:
+        callers = {caller: edge for caller, edge in raw_stats[function][4].items()
+                   if caller in raw_stats and caller not in visited}
+        total = sum(edge[3] for edge in callers.values())
+        if not callers or total <= 0:
+            return [([function], weight)]
+        paths: List[Tuple[List[Tuple], float]] = []
+        for caller, edge in callers.items():
+            caller_weight = weight * edge[3] / total
+            if caller_weight * 1e6 < min_microseconds:
+                continue
+            for path, path_weight in caller_paths(caller, visited | {function}, caller_weight):
+                paths.append((path + [function], path_weight))
+        return paths
+
+    for function, (_cc, _nc, own_time, _cumulative, _callers) in raw_stats.items():
+        if own_time * 1e6 < min_microseconds:
+            continue
+        for path, path_time in caller_paths(function, frozenset(), own_time):
+            microseconds = round(path_time * 1e6)
+            if microseconds:
+                stack = ";".join(_frame_name(*frame) for frame in path)
+                stacks[stack] = stacks.get(stack, 0) + microseconds
+    return stacks
+
+
+class StackSampler(metaclass=ABCMeta):
+    """
+    Samples the main thread's stack on a CPU time timer (SIGPROF), so that only time spent running is sampled.
+    Only available where signal.setitimer is, and only from the main thread.
+    """
+    interval: float
+    samples: Dict[str, int]
+    _root_frame: Any
+    _previous_handler: Any
+
+    def __init__(self, interval: float, root_frame: Any):
+        """
+        :param interval:    The CPU time between samples in seconds
+        :param root_frame:  The frame calling the sampled code; it and its callers are left out of the samples
+        """
+        self.interval = interval
+        self.samples = {}
+        self._root_frame = root_frame
+        self._previous_handler = None
+
+    def _sample(self, _signal_number: int, frame: Any) -> None:
+        names: List[str] = []
+        while frame is not None and frame is not self._root_frame:
+            code = frame.f_code
+            if code.co_filename != cProfile.__file__:
+                names.append(_frame_name(code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        stack = ";".join(reversed(names))
+        self.samples[stack] = self.samples.get(stack, 0) + 1
+
+    def start(self) -> None:
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+
+
+def _write_collapsed(path: str, stacks: Dict[str, int]) -> None:
+    with open(path, "w") as output_file:
+        for stack, count in sorted(stacks.items(), key=lambda item: -item[1]):
+            output_file.write(f"{stack} {count}\n")
+
+
+def _write_json(path: str, record: Dict[str, Any]) -> None:
+    with open(path, "w") as output_file:
+        json.dump(record, output_file, indent=2)
+
+
+def profile_call(settings: ProfileSettings, label: str, function: Callable, *arguments: Any) -> Any:
+    """
+    Call the function under the enabled instruments and write one file per mode.
+
+    :param settings:    The profiling settings
+    :param label:       Names the run in the output file names, such as "96_solve_all"
+    :param function:    The function to call
+    :param arguments:   The function's arguments
+    :return: The function's result
+    """
+    os.makedirs(settings.output_directory, exist_ok=True)
+    started = datetime.datetime.now(datetime.timezone.utc)
+    base_path = os.path.join(settings.output_directory,
+                             f"{re.sub(r'[^A-Za-z0-9_.-]', '_', label)}_{started.strftime('%Y%m%dT%H%M%S%fZ')}")
+
+    profiler = cProfile.Profile() if "cprofile" in settings.modes else None
+    sampler = None
+    if "sample" in settings.modes:
+        if hasattr(signal, "setitimer"):
+            sampler = StackSampler(settings.sample_interval, sys._getframe())
+        else:
+            print("Stack sampling needs signal.setitimer, which this platform lacks", file=sys.stderr)
+    trace_memory = "memory" in settings.modes
+    if trace_memory:
+        tracemalloc.start()
+
+    if sampler is not None:
+        sampler.start()
+    wall_start = time.perf_counter_ns()
+    cpu_start = time.process_time_ns()
+    try:
+        if profiler is not None:
+            result = profiler.runcall(function, *arguments)
+        else:
+            result = function(*arguments)
+    finally:
+        cpu_time = time.process_time_ns() - cpu_start
+        wall_time = time.perf_counter_ns() - wall_start
+        if sampler is not None:
+            sampler.stop()
+        snapshot = None
+        peak = 0
+        if trace_memory:
+            _current, peak = tracemalloc.get_traced_memory()
+            # Leave out the sampler's own allocations
+            snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, __file__)])
+            tracemalloc.stop()
+
+    if "time" in settings.modes:
+        _write_json(f"{base_path}.time.json", {
+            "label": label,
+            "started": started.isoformat(),
+            "wall_ns": wall_time,
+            "cpu_ns": cpu_time,
+            "instruments": list(settings.modes),
+        })
+    if profiler is not None:
+        profiler.dump_stats(f"{base_path}.pstats")
+        _write_collapsed(f"{base_path}.cprofile.folded", collapsed_cprofile_stacks(pstats.Stats(profiler)))
+    if sampler is not None:
+        _write_collapsed(f"{base_path}.sample.folded", sampler.samples)
+    if snapshot is not None:
+        top_statistics = snapshot.statistics("lineno")[:settings.top_allocations]
+        _write_json(f"{base_path}.memory.json", {
+            "label": label,
+            "peak_bytes": peak,
+            "top_allocations": [{
+                "file": statistic.traceback[0].filename,
+                "line": statistic.traceback[0].lineno,
+                "size_bytes": statistic.size,
+                "count": statistic.count,
+            } for statistic in top_statistics],
+        })
+    return result
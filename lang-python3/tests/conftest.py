@@ -0,0 +1,11 @@
+import os
+import sys
+
+
+# The problem modules are plain scripts importing their neighbours by name, so the directories holding them are put
+# on the import path the way running them directly would.
+ROOT_DIRECTORY: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for directory in (ROOT_DIRECTORY, os.path.join(ROOT_DIRECTORY, "79"), os.path.join(ROOT_DIRECTORY, "96")):
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
@@ -0,0 +1,58 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+import memo
+from memo import ResultStore, cacheable, result_key
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """
+    A project directory holding a solver module that imports a helper module, with a lazily imported one beside them.
+    """
+    (tmp_path / "helper.py").write_text("def double(value):\n    return 2 * value\n")
+    (tmp_path / "lazy.py").write_text("OFFSET = 1\n")
+    (tmp_path / "solver.py").write_text("from helper import double\n\n\ndef solve(value):\n    return double(value)\n")
+    monkeypatch.setattr(memo, "PROJECT_DIRECTORY", str(tmp_path))
+    monkeypatch.setattr(memo, "_module_sources", {})
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    for name in ("helper", "lazy", "solver"):
+        sys.modules.pop(name, None)
+
+
+def test_key_follows_imported_project_modules(project):
+    solver = importlib.import_module("solver")
+    key = result_key(solver.solve, [3])
+    assert [os.path.basename(path) for path in memo.module_sources(solver)] == ["helper.py", "solver.py"]
+
+    (project / "helper.py").write_text("def double(value):\n    return value + value\n")
+    assert result_key(solver.solve, [3]) != key
+
+
+def test_explicit_dependencies_are_keyed(project):
+    solver = importlib.import_module("solver")
+    lazy = importlib.import_module("lazy")
+    key = result_key(solver.solve, [3], dependencies=[lazy])
+    assert result_key(solver.solve, [3]) != key
+
+    (project / "lazy.py").write_text("OFFSET = 22\n")
+    assert result_key(solver.solve, [3], dependencies=[lazy]) != key
+
+
+def test_cacheable_misses_after_a_helper_changes(project):
+    store = ResultStore(str(project / "results.sqlite"))
+    solver = importlib.import_module("solver")
+    solve = cacheable(store=store)(solver.solve)
+
+    assert solve(3) == 6
+    assert solve(3) == 6
+    assert (store.hits, store.misses) == (1, 1)
+
+    (project / "helper.py").write_text("def double(value):\n    return value + value\n")
+    assert solve(3) == 6
+    assert (store.hits, store.misses) == (1, 2)
+    store.close()
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+import poker_server
+from poker_server import CARD_CODES, InProcessClient, PokerServer, STATS_COMMAND, evaluate_deals, request_outcomes, \
+    run_self_check
+from problem_54 import to_card, to_hand
+
+
+DEALS = [
+    "5H 5C 6S 7S KD 2C 3S 8S 8D TD",  # player 2 wins with a pair of eights
+    "5D 8C 9S JS AC 2C 5C 7D 8S QH",  # player 1 wins with ace high
+    "2D 9C AS AH AC 3D 6D 7D TD QD",  # player 2 wins with a flush
+    "4D 6S 9H QH QC 3D 6D 7H QD QS",  # player 1 wins with the higher kicker
+    "2H 2D 4C 4D 4S 3C 3D 3S 9S 9D",  # player 1 wins with the higher full house
+]
+EXPECTED = ["2", "1", "2", "1", "1"]
+
+
+@pytest.fixture(params=["in-process", "socket"])
+def transport(request):
+    return request.param
+
+
+def exchange(transport, *connections, batch_window=0.002):
+    """
+    Send each list of lines over its own connection, one connection after another, either through in-process clients
+    or to a server on an ephemeral loopback port.
+
+    :return: The responses of each connection
+    """
+    async def scenario():
+        server = PokerServer(batch_window=batch_window)
+        if transport == "in-process":
+            try:
+                return [await InProcessClient(server).evaluate(lines) for lines in connections]
+            finally:
+                await server.stop()
+        listener = await server.serve(port=0)
+        try:
+            port = listener.sockets[0].getsockname()[1]
+            return [await request_outcomes(port, lines) for lines in connections]
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            await server.stop()
+
+    return asyncio.run(scenario())
+
+
+def test_batch_evaluation_matches_problem_54():
+    rng = random.Random(54)
+    cards = list(CARD_CODES)
+    deals = [" ".join(rng.sample(cards, 10)) for _ in range(0, 2000)]
+    expected = []
+    for deal in deals:
+        serialized_cards = deal.split()
+        result = to_hand(map(to_card, serialized_cards[0:5])).compare_to(to_hand(map(to_card, serialized_cards[5:10])))
+        expected.append("1" if result > 0 else "2" if result < 0 else "0")
+    assert evaluate_deals(deals) == expected
+
+
+def test_outcomes_keep_request_order(transport):
+    assert exchange(transport, DEALS + DEALS[::-1]) == [EXPECTED + EXPECTED[::-1]]
+
+
+def test_malformed_deals_answer_error_lines_in_turn(transport):
+    [responses] = exchange(transport, [DEALS[0], "5H 5C 6S", DEALS[1], "5H 5C 6S 7S KD 2C 3S 8S 8D XX"])
+    assert responses[0] == "2"
+    assert responses[1] == "E expected 10 cards, got 3"
+    assert responses[2] == "1"
+    assert responses[3].startswith("E ")
+
+
+def test_stats_counts_the_deals_before_it(transport):
+    [responses] = exchange(transport, DEALS + [STATS_COMMAND] + DEALS[0:2])
+    assert responses[0:5] == EXPECTED
+    stats = json.loads(responses[5])
+    # Taken once the earlier deals are answered; deals sent after it may have shared their batch
+    assert len(DEALS) <= stats["deals"] <= len(DEALS) + 2
+    assert stats["batches"] >= 1
+    assert responses[6:8] == EXPECTED[0:2]
+
+
+def test_failed_batch_answers_errors_and_batcher_keeps_running(transport, monkeypatch):
+    evaluate_deals = poker_server.evaluate_deals
+    calls = []
+
+    def fail_first_batch(deals):
+        calls.append(len(deals))
+        if len(calls) == 1:
+            raise RuntimeError("evaluator crashed")
+        return evaluate_deals(deals)
+
+    monkeypatch.setattr(poker_server, "evaluate_deals", fail_first_batch)
+    first, second = exchange(transport, DEALS[0:2], DEALS[2:4] + [STATS_COMMAND], batch_window=0.01)
+    assert first == ["E server error: evaluator crashed"] * 2
+    assert second[0:2] == EXPECTED[2:4]
+    assert json.loads(second[2])["failed_batches"] == 1
+
+
+def test_self_check(transport):
+    player_1_wins, stats = asyncio.run(run_self_check(over_socket=transport == "socket"))
+    assert player_1_wins == 376
+    assert stats["deals"] == 1000
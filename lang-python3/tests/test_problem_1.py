@@ -0,0 +1,19 @@
+import random
+
+from numtheory import subset_lcms
+from problem_1 import solve_with_brute_force, solve_with_inclusion_exclusion
+
+
+def test_inclusion_exclusion_matches_brute_force():
+    rng = random.Random(1)
+    for _ in range(0, 200):
+        bases = [rng.randrange(1, 30) for _ in range(0, rng.randrange(1, 6))]
+        max_value = rng.randrange(1, 500)
+        expected = sum(value for value in range(0, max_value) if any(value % base == 0 for base in bases))
+        assert solve_with_inclusion_exclusion(max_value, bases) == expected
+    assert solve_with_inclusion_exclusion(1000) == solve_with_brute_force(1000) == 233168
+
+
+def test_subset_lcms_skip_multiples_over_the_limit():
+    assert sorted(subset_lcms([4, 6, 10])) == [(4, 1), (6, 1), (10, 1), (12, 2), (20, 2), (30, 2), (60, 3)]
+    assert sorted(subset_lcms([4, 6, 10], 20)) == [(4, 1), (6, 1), (10, 1), (12, 2), (20, 2)]
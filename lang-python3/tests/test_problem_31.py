@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from problem_31 import ChangeMaker, find_greedy_counterexample, get_min_coin_counts, greedy_coin_count, is_canonical
+
+UK_COINS = [200, 100, 50, 20, 10, 5, 2, 1]
+
+
+def fewest_coins(limit, denominations):
+    fewest = [0] + [limit + 1] * limit
+    for amount in range(1, limit + 1):
+        fewest[amount] = 1 + min(fewest[amount - coin] for coin in denominations if coin <= amount)
+    return fewest
+
+
+def brute_force_counterexample(denominations):
+    # Kozen and Zaks: if greedy fails at all, it fails below the sum of the two largest coins
+    coins = sorted(set(denominations), reverse=True)
+    limit = coins[0] + coins[1] if len(coins) > 1 else coins[0]
+    fewest = fewest_coins(limit, coins)
+    return next((amount for amount in range(1, limit + 1) if greedy_coin_count(amount, coins) > fewest[amount]), None)
+
+
+@pytest.mark.parametrize("denominations, expected", [
+    ([4, 3, 1], 6),
+    ([25, 10, 1], 30),
+    ([1], None),
+    (UK_COINS, None),
+    ([1, 5, 10, 25, 50, 100], None),
+])
+def test_known_coin_systems(denominations, expected):
+    assert find_greedy_counterexample(denominations) == expected
+    assert is_canonical(denominations) == (expected is None)
+
+
+def test_counterexample_matches_brute_force():
+    rng = random.Random(31)
+    for _ in range(0, 500):
+        denominations = [1] + [rng.randrange(2, 60) for _ in range(0, rng.randrange(1, 6))]
+        assert find_greedy_counterexample(denominations) == brute_force_counterexample(denominations), denominations
+
+
+def test_counterexample_requires_a_one():
+    with pytest.raises(ValueError):
+        find_greedy_counterexample([5, 2])
+
+
+def test_change_maker_answers_fewest_coins():
+    for denominations in (UK_COINS, [4, 3, 1], [25, 10, 1]):
+        change_maker = ChangeMaker(denominations, 500)
+        expected = fewest_coins(500, denominations)
+        assert [change_maker.min_coins(amount) for amount in range(0, 501)] == expected
+        assert list(get_min_coin_counts(500, denominations)) == expected
+    assert ChangeMaker(UK_COINS).canonical
+
+
+def test_change_maker_needs_a_limit_when_greedy_fails():
+    with pytest.raises(ValueError):
+        ChangeMaker([4, 3, 1])
+    with pytest.raises(ValueError):
+        ChangeMaker([4, 3, 1], 10).min_coins(11)
@@ -0,0 +1,25 @@
+import random
+
+import pytest
+
+from problem_54 import HandLeaderboard, to_card, to_hand, top_hands
+
+CARDS = [value + suit for value in "23456789TJQKA" for suit in "CDHS"]
+
+
+def random_hands(count, seed=1):
+    rng = random.Random(seed)
+    return [(to_hand([to_card(card) for card in rng.sample(CARDS, 5)]), index) for index in range(0, count)]
+
+
+def test_leaderboard_rejects_zero_capacity():
+    with pytest.raises(ValueError):
+        HandLeaderboard(0)
+    assert top_hands(random_hands(3), 0) == []
+
+
+def test_top_hands_match_a_full_sort():
+    hands = random_hands(300)
+    # Of equal hands the earliest offered come first
+    expected = sorted(hands, key=lambda entry: (entry[0].sort_key(), -entry[1]), reverse=True)
+    assert [label for _hand, label in top_hands(hands, 10)] == [label for _hand, label in expected[0:10]]
@@ -0,0 +1,55 @@
+import random
+from array import array
+
+import pytest
+
+from problem_79 import KEYLOG_FILE, PasscodeInferer, PrecedenceCycleError, get_bulk_successor_masks, \
+    read_attempt_file, solve_bulk, solve_topological
+
+
+def test_rejected_attempt_leaves_no_new_digits():
+    inferer = PasscodeInferer()
+    inferer.add_attempt([1, 2])
+    with pytest.raises(PrecedenceCycleError):
+        inferer.add_attempt([2, 9, 1])
+
+    assert inferer.passcode() == "12"
+    assert inferer.positions == {1: 0, 2: 1}
+    assert 9 not in inferer.successors and 9 not in inferer.predecessors
+    assert inferer.successors == {1: {2}, 2: set()}
+
+
+def test_rejected_attempt_keeps_order_usable():
+    inferer = PasscodeInferer()
+    inferer.add_attempts([[3, 1], [1, 2]])
+    with pytest.raises(PrecedenceCycleError):
+        inferer.add_attempt([7, 2, 8, 3])
+
+    inferer.add_attempt([2, 5])
+    assert inferer.passcode() == "3125"
+    assert inferer.is_unique()
+
+
+def test_inferer_matches_topological_solver():
+    inferer = PasscodeInferer()
+    inferer.add_attempts(read_attempt_file(KEYLOG_FILE))
+    assert inferer.passcode() == solve_topological(read_attempt_file(KEYLOG_FILE))
+
+
+@pytest.mark.parametrize("alphabet_size", [2, 10, 16, 17, 40])
+@pytest.mark.parametrize("attempt_length", [2, 3, 5])
+def test_bulk_successor_masks_match_pairwise(alphabet_size, attempt_length):
+    rng = random.Random(alphabet_size * attempt_length)
+    digits = array("B", [rng.randrange(alphabet_size) for _ in range(0, attempt_length * 200)])
+    expected = {}
+    for start in range(0, len(digits), attempt_length):
+        for offset in range(0, attempt_length):
+            expected.setdefault(digits[start + offset], 0)
+            if offset + 1 < attempt_length:
+                expected[digits[start + offset]] |= 1 << digits[start + offset + 1]
+
+    assert get_bulk_successor_masks(digits, attempt_length, alphabet_size) == expected
+
+
+def test_solve_bulk():
+    assert solve_bulk(KEYLOG_FILE) == "73162890"
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+import pytest
+
+from problem_96 import SolveBudget, load_grids, solve_async, solve_with_budget
+from sudoku_generator import to_grid
+
+# Needs 92 search nodes
+HARD_PUZZLE = "1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3.."
+
+
+def hard_grid():
+    return to_grid([int(value) if value != "." else 0 for value in HARD_PUZZLE])
+
+
+class PausingBudget(SolveBudget):
+    """
+    A budget that signals its first node and then waits until it is cancelled, so a test can cancel mid-search.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.searching = threading.Event()
+
+    def charge(self) -> None:
+        if not self.searching.is_set():
+            self.searching.set()
+            self.cancelled.wait(5)
+        super().charge()
+
+
+def test_solved_within_budget():
+    outcome = solve_with_budget(hard_grid(), SolveBudget(timeout=60, max_nodes=1000))
+    assert outcome.status == "solved"
+    assert outcome.grid.is_solved()
+    assert outcome.filled_cells() == 81
+
+
+def test_node_budget():
+    outcome = solve_with_budget(hard_grid(), SolveBudget(max_nodes=10))
+    assert outcome.status == "node_budget"
+    assert outcome.nodes == 10
+    assert not outcome.grid.is_solved()
+
+
+def test_deadline():
+    outcome = solve_with_budget(hard_grid(), SolveBudget(timeout=0))
+    assert outcome.status == "deadline"
+
+
+def test_unsolvable():
+    puzzle = list(list(load_grids())[5].values)
+    # A 3 in the second cell of Grid 06 survives propagation but leaves the search without a solution
+    puzzle[1] = 3
+    outcome = solve_with_budget(to_grid(puzzle), SolveBudget(max_nodes=1000))
+    assert outcome.status == "unsolvable"
+
+
+def test_cancelled_from_another_thread():
+    budget = PausingBudget()
+    outcomes = []
+    search = threading.Thread(target=lambda: outcomes.append(solve_with_budget(hard_grid(), budget)))
+    search.start()
+    assert budget.searching.wait(5)
+    budget.cancel()
+    search.join(5)
+    assert outcomes[0].status == "cancelled"
+
+
+def test_cancelled_task_stops_the_search():
+    budget = PausingBudget()
+    grid = hard_grid()
+
+    async def cancel_search():
+        task = asyncio.create_task(solve_async(grid, budget))
+        while not budget.searching.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_search())
+    assert budget.cancelled.is_set()
+    assert not grid.is_solved()
+
+
+def test_cancellation_persists_until_reset():
+    budget = SolveBudget(max_nodes=1000)
+    budget.cancel()
+    assert solve_with_budget(hard_grid(), budget).status == "cancelled"
+    assert solve_with_budget(hard_grid(), budget).status == "cancelled"
+    budget.reset()
+    assert solve_with_budget(hard_grid(), budget).status == "solved"
@@ -0,0 +1,37 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from problem_96 import GRID_FILE, solve_all, solve_all_batch
+from sudoku_batch import load_puzzles, solve_batch
+
+
+def test_contradictory_puzzle_does_not_fail_the_batch():
+    names, puzzles = load_puzzles()
+    batch_puzzles = puzzles[0:4].copy()
+    # Two fives in the first row of the second puzzle
+    batch_puzzles[1, 0:2] = 5
+    batch = solve_batch(puzzles[0:4])
+    unsolved = solve_batch(batch_puzzles)
+
+    assert unsolved.unsolvable.tolist() == [False, True, False, False]
+    assert not unsolved.solutions[1].any()
+    for index in (0, 2, 3):
+        assert unsolved.solutions[index].tolist() == batch.solutions[index].tolist()
+
+
+def test_contradiction_found_by_search_is_reported():
+    names, puzzles = load_puzzles()
+    # A 3 in the second cell of Grid 06 survives the singles but leaves the scalar search without a solution
+    batch_puzzles = puzzles[4:7].copy()
+    batch_puzzles[1, 1] = 3
+    batch = solve_batch(batch_puzzles, names[4:7])
+
+    assert batch.searched.tolist()[1]
+    assert batch.unsolvable.tolist() == [False, True, False]
+    assert not batch.solutions[1].any()
+    assert batch.solutions[[0, 2]].all()
+
+
+def test_batch_matches_scalar_solver():
+    assert solve_all_batch(GRID_FILE) == solve_all(GRID_FILE) == 24702
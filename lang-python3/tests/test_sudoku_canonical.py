@@ -0,0 +1,44 @@
+import random
+
+import sudoku_canonical
+from problem_96 import load_grids, solve
+from sudoku_canonical import SolutionCache, canonicalize, random_equivalent, solve_with_cache
+from sudoku_generator import to_grid
+
+
+def first_puzzle():
+    return list(next(load_grids()).values)
+
+
+def test_exact_repeat_skips_canonicalization(monkeypatch):
+    cache = SolutionCache()
+    puzzle = first_puzzle()
+    solve_with_cache(to_grid(puzzle), cache)
+
+    def fail(*_args):
+        raise AssertionError("canonicalize called for an exact repeat")
+
+    monkeypatch.setattr(sudoku_canonical, "canonicalize", fail)
+    grid = to_grid(puzzle)
+    solve_with_cache(grid, cache)
+    assert grid.is_solved()
+    assert (cache.exact_hits, cache.equivalent_hits, cache.misses) == (1, 0, 1)
+
+
+def test_equivalent_puzzle_is_answered_from_the_canonical_form():
+    cache = SolutionCache(max_candidates=None)
+    puzzle = first_puzzle()
+    solve_with_cache(to_grid(puzzle), cache)
+    equivalent = random_equivalent(puzzle, random.Random(1))
+    grid = to_grid(equivalent)
+    solve_with_cache(grid, cache)
+
+    expected = to_grid(equivalent)
+    solve(expected)
+    assert grid.values == expected.values
+    assert cache.equivalent_hits == 1
+
+
+def test_bound_gives_up_on_sparse_puzzles():
+    assert canonicalize([0] * 81, 256) is None
+    assert canonicalize(first_puzzle(), None) is not None
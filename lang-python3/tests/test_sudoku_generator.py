@@ -0,0 +1,12 @@
+import random
+
+import benchmark
+from sudoku_generator import percentile
+
+
+def test_percentile_agrees_with_the_benchmark_report():
+    rng = random.Random(30)
+    for count in range(1, 200):
+        values = sorted(rng.random() for _ in range(0, count))
+        for percent in (0, 1, 10, 33.3, 50, 66.7, 90, 99, 99.9, 100):
+            assert percentile(values, percent) == benchmark.percentile(values, percent)